@@ -1,29 +1,98 @@
 """
 Analysis Orchestrator
 
-Pipeline: CSV bytes → parse → build graph → detect patterns → score → format output
+Pipeline: CSV bytes → parse + build graph (one streaming pass) → detect patterns
+          → score → format output
 
 This is the single entry point called by the upload API route.
 """
 
 from __future__ import annotations
+import hashlib
+import multiprocessing
+import multiprocessing.connection
+import multiprocessing.forkserver
+import pickle
+import threading
 import time
-from typing import Any, Dict, List, Set
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Any, BinaryIO, Callable, DefaultDict, Dict, List, Set, Tuple
 
-from .parser import parse_csv, Transaction
-from .graph import build_graph, TransactionGraph
+from .parser import EPOCH
+from .graph import parse_and_build, TransactionGraph
 from .detectors.cycles import detect_cycles
 from .detectors.smurfing import detect_smurfing
 from .detectors.shells import detect_shell_networks
+from .detectors.timeout import DetectorTimeout
 from .scorer import score_accounts, score_ring
 
 
-def analyze(csv_content: bytes) -> Dict[str, Any]:
+# Wall-clock budget (seconds) for the detectors of one analysis; a
+# detector that hasn't finished by then contributes empty results
+DETECTOR_TIMEOUT = 15
+
+# Graphs with fewer edges than this run the detectors in-process: they
+# finish in a few milliseconds, less than starting worker processes costs
+PARALLEL_MIN_EDGES = 20_000
+
+# Detector worker processes come from a forkserver (spawn where there is
+# none), never a fork of the threaded server process itself. The server
+# preloads this module, so each worker starts with the detectors imported
+_DETECTOR_START_METHOD = (
+    "forkserver"
+    if "forkserver" in multiprocessing.get_all_start_methods()
+    else "spawn"
+)
+_detector_context = multiprocessing.get_context(_DETECTOR_START_METHOD)
+if _DETECTOR_START_METHOD == "forkserver":
+    _detector_context.set_forkserver_preload(["__main__", __name__])
+
+_DETECTORS: Tuple[Callable[..., list], ...] = (
+    detect_cycles,
+    detect_smurfing,
+    detect_shell_networks,
+)
+
+# Results of recent analyses, keyed by a hash of the CSV bytes, so a
+# re-uploaded file skips the whole pipeline
+RESULT_CACHE_SIZE = 32       # entries kept (least recently used evicted)
+RESULT_CACHE_TTL = 300       # seconds an entry stays valid
+# Graph edges held across all entries. Each edge is a dict in the result
+# (~0.4 KB), so this bounds the cache at roughly 80 MB; a result bigger
+# than the whole budget is not cached at all
+RESULT_CACHE_MAX_EDGES = 200_000
+# digest → (time stored, edge count, result)
+_result_cache: OrderedDict[bytes, Tuple[float, int, Dict[str, Any]]] = OrderedDict()
+_result_cache_edges = 0      # sum of the entries' edge counts
+_result_cache_lock = threading.Lock()
+
+
+@dataclass(slots=True)
+class _AccountRecord:
+    """Everything the aggregation step tracks for one flagged account."""
+    patterns: Set[str] = field(default_factory=set)  # pattern types
+    details: Set[str] = field(default_factory=set)   # specific pattern labels
+    ring_id: str = ""                                # primary (latest) ring_id
+    involvement: int = 0                             # ring count
+
+
+def analyze(csv_content: bytes | BinaryIO) -> Dict[str, Any]:
     """
     Run the full analysis pipeline on raw CSV bytes.
 
+    Identical content analyzed within the last RESULT_CACHE_TTL seconds
+    is served from a small LRU cache instead of being recomputed. The
+    cache is bounded by entry count and by total graph edges, and holds
+    no result that a detector timeout left incomplete.
+
     Args:
-        csv_content: Raw bytes of the uploaded CSV file.
+        csv_content: Raw bytes of the uploaded CSV file, or a seekable
+            binary file object holding them (e.g. the upload's spooled
+            temporary file), which is hashed and parsed in chunks rather
+            than read into memory whole.
 
     Returns:
         A dict matching the exact JSON output schema:
@@ -32,40 +101,108 @@ def analyze(csv_content: bytes) -> Dict[str, Any]:
             "fraud_rings": [...],
             "summary": {...}
         }
+        Callers get their own top-level and summary dicts and may add keys
+        to them, but the other nested lists and dicts are shared with the
+        cache and must not be modified. On a cache hit
+        processing_time_seconds is this call's own (lookup) time.
     """
-    start_time = time.time()
+    global _result_cache_edges
 
-    # ── Step 1: Parse CSV ──────────────────────────────────────────
-    transactions = parse_csv(csv_content)
+    start_ns = time.perf_counter_ns()
 
-    # ── Step 2: Build Graph ────────────────────────────────────────
-    graph = build_graph(transactions)
+    if isinstance(csv_content, bytes):
+        digest = hashlib.blake2b(csv_content, digest_size=16).digest()
+    else:
+        start = csv_content.tell()
+        digest = hashlib.file_digest(
+            csv_content, lambda: hashlib.blake2b(digest_size=16),
+        ).digest()
+        csv_content.seek(start)  # rewind for the parser
+    now = time.monotonic()
 
-    # ── Step 3: Run Detectors (with Timeout Protection) ────────────
-    import concurrent.futures
+    with _result_cache_lock:
+        entry = _result_cache.get(digest)
+        if entry is not None:
+            if now - entry[0] < RESULT_CACHE_TTL:
+                _result_cache.move_to_end(digest)
+                hit = dict(entry[2])
+                hit["summary"] = dict(
+                    hit["summary"],
+                    processing_time_seconds=_elapsed_seconds(start_ns),
+                )
+                return hit
+            _evict_result(digest)
 
-    def run_detectors():
-        return (
-            detect_cycles(graph),
-            detect_smurfing(graph),
-            detect_shell_networks(graph),
-        )
+    result, complete = _run_pipeline(csv_content)
+    if not complete:
+        # A detector timed out; a retry should run the analysis again
+        return dict(result)
+    edge_count = len(result["graph"]["edges"])
 
-    try:
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(run_detectors)
-            # Give detectors 15 seconds max to complete
-            cycle_rings, smurfing_rings, shell_chains = future.result(timeout=15)
-    except concurrent.futures.TimeoutError:
-        print("WARNING: Detectors timed out, proceeding with empty results.")
-        cycle_rings, smurfing_rings, shell_chains = [], [], []
+    with _result_cache_lock:
+        # Drop everything expired, not just entries that get asked for
+        # again, so stale results don't stay resident
+        expired = [
+            key for key, (stored_at, _, _) in _result_cache.items()
+            if now - stored_at >= RESULT_CACHE_TTL
+        ]
+        for key in expired:
+            _evict_result(key)
+
+        if edge_count <= RESULT_CACHE_MAX_EDGES:
+            if digest in _result_cache:
+                _evict_result(digest)  # cached meanwhile by another request
+            _result_cache[digest] = (now, edge_count, result)
+            _result_cache_edges += edge_count
+            while (
+                len(_result_cache) > RESULT_CACHE_SIZE
+                or _result_cache_edges > RESULT_CACHE_MAX_EDGES
+            ):
+                _evict_result(next(iter(_result_cache)))
+
+    return dict(result)
+
+
+def _evict_result(digest: bytes) -> None:
+    """Remove one cache entry; caller holds _result_cache_lock."""
+    global _result_cache_edges
+    _, edge_count, _ = _result_cache.pop(digest)
+    _result_cache_edges -= edge_count
+
+
+def _elapsed_seconds(start_ns: int) -> float:
+    """
+    Seconds since a time.perf_counter_ns() reading — a monotonic integer
+    clock — at millisecond resolution, since processing_time_seconds is
+    part of the API schema.
+    """
+    return (time.perf_counter_ns() - start_ns) // 1_000_000 / 1000
+
+
+def _run_pipeline(csv_content: bytes | BinaryIO) -> Tuple[Dict[str, Any], bool]:
+    """
+    Parse, build, detect, score and format — the uncached analysis.
+
+    Returns:
+        (result, complete) — the result dict (see analyze), and whether
+        every detector finished within its deadline.
+    """
+    start_ns = time.perf_counter_ns()
+
+    # ── Steps 1–2: Parse CSV + Build Graph ─────────────────────────
+    # Fused: each validated row is added to the graph as it is parsed
+    graph = parse_and_build(csv_content)
+    # Force CSR construction up front: the detectors share the one
+    # encoding, and it is what gets sent to the worker processes
+    graph.build_csr()
+
+    # ── Step 3: Run Detectors (with Timeout Protection) ────────────
+    (cycle_rings, smurfing_rings, shell_chains), complete = _run_detectors(graph)
 
     # ── Step 4: Aggregate Results ──────────────────────────────────
-    # Track per-account pattern involvement
-    account_patterns: Dict[str, Set[str]] = {}       # account → set of pattern types
-    account_ring_ids: Dict[str, str] = {}             # account → primary ring_id
-    account_involvement: Dict[str, int] = {}          # account → ring count
-    account_pattern_details: Dict[str, Set[str]] = {} # account → specific pattern labels
+    # Track per-account pattern involvement (one record per account, so
+    # each member costs a single dict lookup per ring)
+    accounts: DefaultDict[str, _AccountRecord] = defaultdict(_AccountRecord)
 
     fraud_rings: List[Dict[str, Any]] = []
     ring_counter = 0
@@ -74,11 +211,13 @@ def analyze(csv_content: bytes) -> Dict[str, Any]:
     for cr in cycle_rings:
         ring_counter += 1
         ring_id = f"RING_{ring_counter:03d}"
+        detail = f"cycle_length_{cr.length}"
         for member in cr.members:
-            account_patterns.setdefault(member, set()).add("cycle")
-            account_pattern_details.setdefault(member, set()).add(f"cycle_length_{cr.length}")
-            account_ring_ids[member] = ring_id
-            account_involvement[member] = account_involvement.get(member, 0) + 1
+            rec = accounts[member]
+            rec.patterns.add("cycle")
+            rec.details.add(detail)
+            rec.ring_id = ring_id
+            rec.involvement += 1
 
         fraud_rings.append({
             "ring_id": ring_id,
@@ -92,10 +231,11 @@ def analyze(csv_content: bytes) -> Dict[str, Any]:
         ring_counter += 1
         ring_id = f"RING_{ring_counter:03d}"
         for member in sr.members:
-            account_patterns.setdefault(member, set()).add("smurfing")
-            account_pattern_details.setdefault(member, set()).add(sr.pattern)
-            account_ring_ids[member] = ring_id
-            account_involvement[member] = account_involvement.get(member, 0) + 1
+            rec = accounts[member]
+            rec.patterns.add("smurfing")
+            rec.details.add(sr.pattern)
+            rec.ring_id = ring_id
+            rec.involvement += 1
 
         fraud_rings.append({
             "ring_id": ring_id,
@@ -108,14 +248,13 @@ def analyze(csv_content: bytes) -> Dict[str, Any]:
     for sc in shell_chains:
         ring_counter += 1
         ring_id = f"RING_{ring_counter:03d}"
+        shell_accounts = set(sc.shell_accounts)
         for member in sc.members:
-            account_patterns.setdefault(member, set()).add("layered_shell")
-            detail = "layered_shell"
-            if member in sc.shell_accounts:
-                detail = "shell_intermediary"
-            account_pattern_details.setdefault(member, set()).add(detail)
-            account_ring_ids[member] = ring_id
-            account_involvement[member] = account_involvement.get(member, 0) + 1
+            rec = accounts[member]
+            rec.patterns.add("layered_shell")
+            rec.details.add("shell_intermediary" if member in shell_accounts else "layered_shell")
+            rec.ring_id = ring_id
+            rec.involvement += 1
 
         fraud_rings.append({
             "ring_id": ring_id,
@@ -125,7 +264,10 @@ def analyze(csv_content: bytes) -> Dict[str, Any]:
         })
 
     # ── Step 5: Score ──────────────────────────────────────────────
-    account_scores = score_accounts(account_patterns, account_involvement)
+    account_scores = score_accounts(
+        {account_id: rec.patterns for account_id, rec in accounts.items()},
+        {account_id: rec.involvement for account_id, rec in accounts.items()},
+    )
 
     # Score each ring
     for ring in fraud_rings:
@@ -133,18 +275,19 @@ def analyze(csv_content: bytes) -> Dict[str, Any]:
         ring["risk_score"] = score_ring(member_scores, ring["pattern_type"])
 
     # ── Step 6: Format Output ──────────────────────────────────────
-    processing_time = round(time.time() - start_time, 2)
+    processing_time = _elapsed_seconds(start_ns)
 
     # Build suspicious_accounts (sorted by score descending)
     suspicious_accounts = []
-    for account_id, score in sorted(account_scores.items(), key=lambda x: -x[1]):
-        patterns = list(account_pattern_details.get(account_id, set()))
-        ring_id = account_ring_ids.get(account_id, "UNKNOWN")
+    # itemgetter + reverse avoids a Python lambda call per account; reverse
+    # sorting stays stable, so ties keep their aggregation order
+    for account_id, score in sorted(account_scores.items(), key=itemgetter(1), reverse=True):
+        rec = accounts[account_id]
         suspicious_accounts.append({
             "account_id": account_id,
             "suspicion_score": score,
-            "detected_patterns": patterns,
-            "ring_id": ring_id,
+            "detected_patterns": list(rec.details),
+            "ring_id": rec.ring_id,
         })
 
     # Build fraud_rings output (clean up internal fields)
@@ -159,12 +302,13 @@ def analyze(csv_content: bytes) -> Dict[str, Any]:
 
     # ── Step 7: Build graph visualization data ────────────────────
     graph_nodes = []
-    for node_id in graph.nodes:
-        node_stats = graph.stats.get(node_id, None)
-        total_txns = node_stats.total_txn_count if node_stats else 0
-        pattern_set = account_patterns.get(node_id, set())
+    # Every node has a stats entry, so walk those directly instead of
+    # looking each node up again
+    for node_id, node_stats in graph.stats.items():
+        total_txns = node_stats.total_txn_count
+        rec = accounts.get(node_id)
         # Normalize pattern type for frontend CSS classes
-        raw_pattern = next(iter(pattern_set), None)
+        raw_pattern = next(iter(rec.patterns), None) if rec else None
         pattern_type = None
         if raw_pattern == "layered_shell":
             pattern_type = "shell"
@@ -175,23 +319,31 @@ def analyze(csv_content: bytes) -> Dict[str, Any]:
             "id": node_id,
             "riskScore": account_scores.get(node_id, 0),
             "suspicious": node_id in account_scores,
-            "ringId": account_ring_ids.get(node_id),
+            "ringId": rec.ring_id if rec else None,
             "patternType": pattern_type,
             "totalTransactions": total_txns,
         })
 
-    graph_edges = []
-    for sender, edges_list in graph.adj.items():
-        for edge in edges_list:
-            graph_edges.append({
-                "id": edge.transaction_id,
-                "source": sender,
-                "target": edge.target,
-                "amount": edge.amount,
-                "timestamp": edge.timestamp.isoformat(),
-            })
-
-    return {
+    # One comprehension zipped over the edge columns
+    graph_edges = [
+        {
+            "id": txn_id,
+            "source": source,
+            "target": target,
+            "amount": amount,
+            # Back to a naive datetime; ISO-formatted by the JSON encoder
+            "timestamp": EPOCH + timedelta(seconds=timestamp),
+        }
+        for txn_id, source, target, amount, timestamp in zip(
+            graph.edge_ids,
+            graph.edge_sources,
+            graph.edge_targets,
+            graph.edge_amounts,
+            graph.edge_timestamps,
+        )
+    ]
+
+    result = {
         "suspicious_accounts": suspicious_accounts,
         "fraud_rings": fraud_rings_out,
         "graph": {
@@ -215,3 +367,117 @@ def analyze(csv_content: bytes) -> Dict[str, Any]:
             "processing_time_seconds": processing_time,
         },
     }
+    return result, complete
+
+
+def start_detector_server() -> None:
+    """
+    Start the forkserver that detector workers are forked from.
+
+    Called once at application startup, so the first large analysis
+    doesn't pay for it; it is started on demand otherwise. As with any
+    spawn-style process start, a script that analyzes large inputs
+    directly needs the `if __name__ == "__main__":` guard.
+    """
+    if _DETECTOR_START_METHOD == "forkserver":
+        multiprocessing.forkserver.ensure_running()
+
+
+def _run_detectors(graph: TransactionGraph) -> Tuple[Tuple[list, list, list], bool]:
+    """
+    Run the three detectors, in parallel worker processes for large graphs.
+
+    Graphs under PARALLEL_MIN_EDGES are scanned in-process, one detector
+    after another, each checking the shared deadline inside its loops.
+    Larger ones get one fresh worker process per detector, owned by this
+    call alone: the detectors are independent, CPU-bound Python, so
+    threads would just take turns on the GIL. Each worker is sent the
+    pickled CSR view — the only part of the graph the detectors read.
+
+    Either way a detector that misses the DETECTOR_TIMEOUT deadline is
+    dropped with a warning, without losing the others' results.
+
+    Args:
+        graph: The built transaction graph.
+
+    Returns:
+        ((cycle_rings, smurfing_rings, shell_chains), complete) — complete
+        is False if any detector timed out and contributed empty results.
+    """
+    if graph.edge_count < PARALLEL_MIN_EDGES:
+        deadline = time.monotonic() + DETECTOR_TIMEOUT
+        results: List[list] = []
+        complete = True
+        for detector in _DETECTORS:
+            try:
+                results.append(detector(graph, deadline=deadline))
+            except DetectorTimeout:
+                print(f"WARNING: {detector.__name__} timed out, proceeding with empty results.")
+                results.append([])
+                complete = False
+        return tuple(results), complete
+
+    payload = pickle.dumps(graph.build_csr(), pickle.HIGHEST_PROTOCOL)
+    workers = []
+    finished: Dict[Callable[..., list], list] = {}
+    try:
+        for detector in _DETECTORS:
+            receiver, sender = _detector_context.Pipe(duplex=False)
+            process = _detector_context.Process(
+                target=_detector_process,
+                args=(detector, payload, sender),
+                daemon=True,
+            )
+            workers.append((detector, process, receiver))
+            process.start()
+            sender.close()
+
+        # Timed from here: the workers are running, not waiting in a queue
+        deadline = time.monotonic() + DETECTOR_TIMEOUT
+        pending = {receiver: detector for detector, _, receiver in workers}
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for receiver in multiprocessing.connection.wait(list(pending), remaining):
+                detector = pending.pop(receiver)
+                try:
+                    ok, value = receiver.recv()
+                except EOFError:
+                    raise RuntimeError(f"{detector.__name__} worker exited without a result")
+                if not ok:
+                    raise value
+                finished[detector] = value
+    finally:
+        # Only this call's own workers are stopped; a finished one is
+        # already on its way out
+        for detector, process, receiver in workers:
+            if process.is_alive() and detector not in finished:
+                process.kill()
+            if process.pid is not None:
+                process.join()
+            receiver.close()
+
+    results = []
+    for detector in _DETECTORS:
+        if detector not in finished:
+            print(f"WARNING: {detector.__name__} timed out, proceeding with empty results.")
+        results.append(finished.get(detector, []))
+    return tuple(results), len(finished) == len(_DETECTORS)
+
+
+def _detector_process(
+    detector: Callable[..., list],
+    payload: bytes,
+    sender: multiprocessing.connection.Connection,
+) -> None:
+    """Worker process entry point: run one detector against the pickled
+    CSR view and send back (True, result), or (False, exception)."""
+    try:
+        result = detector(TransactionGraph.from_csr(pickle.loads(payload)))
+    except Exception as exc:
+        sender.send((False, exc))
+    else:
+        sender.send((True, result))
+    finally:
+        sender.close()
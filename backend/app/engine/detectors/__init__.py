@@ -2,3 +2,4 @@
 from .cycles import detect_cycles
 from .smurfing import detect_smurfing
 from .shells import detect_shell_networks
+from .timeout import DetectorTimeout
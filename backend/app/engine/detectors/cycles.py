@@ -6,25 +6,38 @@ Detects closed loops where money flows in a circle:
     A → B → C → D → A  (cycle of length 4)
 
 Algorithm:
-    - Iterative DFS-based cycle finder on the directed transaction graph
-    - Pre-filters to only start from nodes with both in-degree and out-degree > 0
+    - Iterative DFS-based cycle finder over the integer-indexed CSR graph
+    - Trims nodes without both in-degree and out-degree > 0, then runs Tarjan's
+      SCC and only searches inside components with at least min_length members
     - Constrained to cycles of length 3 to 5
-    - Deduplicates cycles (A→B→C→A is the same ring as B→C→A→B)
+    - Only searches each cycle from its smallest member, skipping smaller
+      neighbors via bisect over the sorted CSR rows, so A→B→C→A and B→C→A→B
+      are one ring and every path found is already normalized
+    - Deduplicates found cycles by a 64-bit hash of their members
     - Hard iteration limit (100K steps) to guarantee termination on dense graphs
+    - Optional wall-clock deadline, checked inside the SCC pass and the DFS
 """
 
 from __future__ import annotations
+from array import array
+from bisect import bisect_left
 from dataclasses import dataclass
-from typing import List, Set
+from typing import List, Optional, Set, Tuple
 from ..graph import TransactionGraph
+from .timeout import CHECK_INTERVAL, check_deadline
 
 
 # Safety limits to prevent combinatorial explosion on dense graphs
 MAX_ITERATIONS = 100_000  # Hard cap on DFS steps
 MAX_CYCLES = 50           # Stop after finding this many unique cycles
 
+# 64-bit FNV-1a parameters for cycle dedup keys
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
 
-@dataclass
+
+@dataclass(slots=True)
 class CycleRing:
     """A detected circular routing ring."""
     members: List[str]
@@ -35,98 +48,271 @@ def detect_cycles(
     graph: TransactionGraph,
     min_length: int = 3,
     max_length: int = 5,
+    deadline: Optional[float] = None,
 ) -> List[CycleRing]:
     """
     Find unique directed cycles of length min_length to max_length.
 
-    Uses an iterative bounded DFS from candidate nodes only (nodes that have
-    both in-degree and out-degree > 0). Includes a hard iteration limit
+    Uses an iterative bounded DFS from candidate nodes only (members of
+    strongly-connected components with at least min_length nodes), never
+    leaving the start node's component. Includes a hard iteration limit
     to prevent hangs on dense graphs.
 
     Args:
         graph: TransactionGraph with adjacency lists.
         min_length: Minimum cycle length (default 3).
         max_length: Maximum cycle length (default 5).
+        deadline: time.monotonic() value to give up at, if any.
 
     Returns:
         List of CycleRing objects, each containing the member account IDs.
+
+    Raises:
+        DetectorTimeout: If the deadline passes before the search is done.
+    """
+    csr = graph.csr
+
+    row_ptr, col_idx = csr.row_ptr, csr.col_idx
+    n = csr.node_count
+
+    # Trim: a node without both incoming and outgoing edges can't be on a cycle
+    in_degree, out_degree = csr.in_degree, csr.out_degree
+    active = bytearray(
+        1 if in_degree[v] and out_degree[v] else 0
+        for v in range(n)
+    )
+
+    # Only strongly-connected components with ≥ min_length members can hold
+    # a cycle that long; everything else is dropped before the DFS
+    comp_id, comp_size = _tarjan_sccs(row_ptr, col_idx, active, deadline)
+    candidates = array("i", (
+        v for v in range(n)
+        if comp_id[v] >= 0 and comp_size[comp_id[v]] >= min_length
+    ))
+
+    members_flat, lengths = _dfs_cycles(
+        row_ptr, col_idx, comp_id, candidates,
+        min_length, max_length, MAX_CYCLES, MAX_ITERATIONS, deadline,
+    )
+
+    # Convert index cycles back to account IDs
+    ids = csr.ids
+    results: List[CycleRing] = []
+    offset = 0
+    for length in lengths:
+        results.append(CycleRing(
+            members=[ids[i] for i in members_flat[offset:offset + length]],
+            length=length,
+        ))
+        offset += length
+    return results
+
+
+def _dfs_cycles(
+    row_ptr: array,
+    col_idx: array,
+    comp_id: array,
+    candidates: array,
+    min_length: int,
+    max_length: int,
+    max_cycles: int,
+    max_iterations: int,
+    deadline: Optional[float] = None,
+) -> Tuple[array, array]:
     """
-    found_cycles: Set[tuple] = set()
+    Bounded DFS cycle search over flat CSR arrays.
+
+    Works purely on int arrays and returns flat int arrays, so it has no
+    dependency on the string-keyed graph and can be swapped for a compiled
+    kernel without touching the caller.
+
+    Args:
+        row_ptr: CSR row offsets.
+        col_idx: CSR target node indices.
+        comp_id: SCC id per node index (-1 for trimmed nodes).
+        candidates: Start node indices, in ascending order.
+        min_length: Minimum cycle length.
+        max_length: Maximum cycle length.
+        max_cycles: Stop after finding this many unique cycles.
+        max_iterations: Hard cap on DFS steps.
+        deadline: time.monotonic() value to give up at, if any.
+
+    Returns:
+        (members_flat, lengths) — the members of every unique cycle
+        concatenated, each starting at its smallest node index, and the
+        length of each cycle in order.
+    """
+    found_cycles: Set[int] = set()     # FNV-1a hashes of normalized cycles
+    members_flat = array("i")
+    lengths = array("i")
     iteration_count = 0
 
-    # Pre-filter: only consider nodes that can participate in a cycle
-    # (must have both incoming and outgoing edges)
-    candidates = sorted([
-        n for n in graph.nodes
-        if graph.stats.get(n)
-        and graph.stats[n].in_degree > 0
-        and graph.stats[n].out_degree > 0
-    ])
+    # One path / cursor / visited buffer shared by every DFS; entries are
+    # undone on backtrack instead of copied on every push. Contiguous int
+    # buffers, so the hot loop allocates nothing per step
+    path = array("i", [0]) * max_length    # path[k] = node at depth k
+    cursor = array("i", [0]) * max_length  # cursor[k] = next edge offset of path[k]
+    visited = bytearray(len(row_ptr) - 1)
 
     for start_node in candidates:
-        if len(found_cycles) >= MAX_CYCLES or iteration_count >= MAX_ITERATIONS:
+        if len(found_cycles) >= max_cycles or iteration_count >= max_iterations:
             break
 
-        # Iterative DFS using an explicit stack
-        # Stack items: (current_node, path, visited_set, neighbor_index)
-        neighbors_of_start = graph.get_neighbors(start_node)
-        stack: list[tuple[str, list[str], set[str], int]] = [
-            (start_node, [start_node], {start_node}, 0)
-        ]
+        # Edges leaving the start's SCC can never lead back to it
+        start_comp = comp_id[start_node]
+
+        # Each cycle is only searched from its smallest member, so every
+        # neighbor below start_node is skipped; rows are sorted, so that is
+        # one bisect per row instead of a scan
+        path[0] = start_node
+        cursor[0] = bisect_left(col_idx, start_node, row_ptr[start_node], row_ptr[start_node + 1])
+        visited[start_node] = 1
+        depth = 1
 
-        while stack:
+        while depth:
             iteration_count += 1
-            if iteration_count >= MAX_ITERATIONS or len(found_cycles) >= MAX_CYCLES:
+            if iteration_count >= max_iterations or len(found_cycles) >= max_cycles:
                 break
+            if not iteration_count % CHECK_INTERVAL:
+                check_deadline(deadline)
 
-            current, path, visited, neighbor_idx = stack.pop()
-            neighbors = graph.get_neighbors(current)
+            top = depth - 1
+            current = path[top]
+            pos = cursor[top]
 
-            for i in range(neighbor_idx, len(neighbors)):
-                neighbor = neighbors[i]
-                iteration_count += 1
-                if iteration_count >= MAX_ITERATIONS or len(found_cycles) >= MAX_CYCLES:
-                    break
+            # All neighbors exhausted — backtrack
+            if pos >= row_ptr[current + 1]:
+                visited[current] = 0
+                depth -= 1
+                continue
 
-                # Found a cycle back to start
-                if neighbor == start_node and len(path) >= min_length:
-                    normalized = _normalize_cycle(path)
-                    found_cycles.add(normalized)
-                    continue
+            neighbor = col_idx[pos]
+            cursor[top] = pos + 1
 
-                # Extend path if within bounds and not revisiting
-                if neighbor not in visited and len(path) < max_length:
-                    # Push current state with next neighbor index for backtracking
-                    stack.append((current, path[:], visited.copy(), i + 1))
-                    # Push new state
-                    new_path = path + [neighbor]
-                    new_visited = visited | {neighbor}
-                    stack.append((neighbor, new_path, new_visited, 0))
-                    break  # Process new node next
-            # If we exhausted all neighbors, backtracking happens naturally (pop next from stack)
-
-    # Convert to CycleRing objects
-    results = [
-        CycleRing(members=list(cycle_key), length=len(cycle_key))
-        for cycle_key in found_cycles
-    ]
-    return results
+            # Found a cycle back to start
+            if neighbor == start_node:
+                if depth >= min_length:
+                    key = _cycle_hash(path, depth)
+                    if key not in found_cycles:
+                        found_cycles.add(key)
+                        # Materialize members only for rings we keep
+                        members_flat.extend(path[:depth])
+                        lengths.append(depth)
+                continue
+
+            # Extend path if within bounds, inside the SCC and not revisiting
+            if (
+                not visited[neighbor]
+                and depth < max_length
+                and comp_id[neighbor] == start_comp
+            ):
+                path[depth] = neighbor
+                cursor[depth] = bisect_left(col_idx, start_node, row_ptr[neighbor], row_ptr[neighbor + 1])
+                visited[neighbor] = 1
+                depth += 1
+
+        # Clear whatever is left on the path if a limit cut the DFS short
+        for k in range(depth):
+            visited[path[k]] = 0
 
+    return members_flat, lengths
 
-def _normalize_cycle(cycle: List[str]) -> tuple:
+
+def _tarjan_sccs(
+    row_ptr: array,
+    col_idx: array,
+    active: bytearray,
+    deadline: Optional[float] = None,
+) -> Tuple[array, array]:
     """
-    Normalize a cycle so that the smallest account ID is first.
-    This ensures A→B→C→A and B→C→A→B produce the same key.
+    Tarjan's strongly-connected components over the active nodes.
+
+    Iterative, with an explicit work stack, so deep graphs don't hit
+    Python's recursion limit.
 
     Args:
-        cycle: List of account IDs forming the cycle.
+        row_ptr: CSR row offsets.
+        col_idx: CSR target node indices.
+        active: 1 for nodes to include; edges to inactive nodes are ignored.
+        deadline: time.monotonic() value to give up at, if any.
 
     Returns:
-        A tuple of account IDs starting with the lexicographically smallest.
+        (comp_id, comp_size) — SCC id per node index (-1 if inactive),
+        and the member count of each SCC.
     """
-    if not cycle:
-        return ()
+    n = len(row_ptr) - 1
+    order = array("i", [-1]) * n
+    low = array("i", bytes(4 * n))
+    on_stack = bytearray(n)
+    comp_id = array("i", [-1]) * n
+    comp_size = array("i")
+    scc_stack: List[int] = []
+    counter = 0
+    steps = 0
+
+    for root in range(n):
+        if not active[root] or order[root] != -1:
+            continue
+
+        order[root] = low[root] = counter
+        counter += 1
+        scc_stack.append(root)
+        on_stack[root] = 1
+        # Work items: (node, next edge offset to examine)
+        work = [(root, row_ptr[root])]
 
-    min_idx = cycle.index(min(cycle))
-    normalized = cycle[min_idx:] + cycle[:min_idx]
-    return tuple(normalized)
+        while work:
+            steps += 1
+            if not steps % CHECK_INTERVAL:
+                check_deadline(deadline)
+            v, pos = work[-1]
+            end = row_ptr[v + 1]
+            while pos < end:
+                w = col_idx[pos]
+                pos += 1
+                if not active[w]:
+                    continue
+                if order[w] == -1:
+                    # Descend into w, resume v at pos afterwards
+                    work[-1] = (v, pos)
+                    order[w] = low[w] = counter
+                    counter += 1
+                    scc_stack.append(w)
+                    on_stack[w] = 1
+                    work.append((w, row_ptr[w]))
+                    break
+                if on_stack[w] and order[w] < low[v]:
+                    low[v] = order[w]
+            else:
+                # All edges of v examined
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[v] < low[parent]:
+                        low[parent] = low[v]
+                if low[v] == order[v]:
+                    k = len(comp_size)
+                    size = 0
+                    while True:
+                        w = scc_stack.pop()
+                        on_stack[w] = 0
+                        comp_id[w] = k
+                        size += 1
+                        if w == v:
+                            break
+                    comp_size.append(size)
+
+    return comp_id, comp_size
+
+
+def _cycle_hash(path: array, length: int) -> int:
+    """
+    64-bit FNV-1a hash of the cycle path[:length] (smallest member first).
+
+    Used as the dedup key instead of a tuple of members, so a cycle that
+    was already found costs no allocation.
+    """
+    h = _FNV_OFFSET
+    for k in range(length):
+        h = ((h ^ path[k]) * _FNV_PRIME) & _MASK_64
+    return h
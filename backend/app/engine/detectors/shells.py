@@ -10,15 +10,24 @@ Detection rules:
     - These intermediaries are likely passthrough "shell" accounts
 
 Algorithm:
-    - For each node, attempt to extend a directed path
+    - Re-encode the graph as integer-indexed CSR arrays
+    - For each node, extend directed paths with an iterative (explicit-stack) DFS
     - At each hop, check if the intermediate node is "shell-like" (low degree)
+    - Skip shells that can't reach MIN_CHAIN_HOPS from where they sit
     - If a chain of 3+ valid hops is found, flag it as a shell network
+    - Keep only the longest chain per (start, end) pair, so sub-chains of a
+      longer chain aren't reported separately
+    - Hard caps on chains found and DFS steps to guarantee termination on
+      dense clusters of shell accounts
+    - Optional wall-clock deadline, checked inside the DFS
 """
 
 from __future__ import annotations
+from array import array
 from dataclasses import dataclass
-from typing import List, Set, Dict
-from ..graph import TransactionGraph
+from typing import Dict, List, Optional, Tuple
+from ..graph import TransactionGraph, CSRGraph
+from .timeout import CHECK_INTERVAL, check_deadline
 
 
 # An intermediate node is considered a "shell" if its total degree is
@@ -32,8 +41,12 @@ MIN_CHAIN_HOPS = 3
 # Maximum chain length to search (prevents runaway DFS)
 MAX_CHAIN_HOPS = 8
 
+# Safety limits to prevent combinatorial explosion on dense shell clusters
+MAX_ITERATIONS = 1_000_000  # Hard cap on DFS steps (every start node costs some)
+MAX_SHELL_CHAINS = 500      # Stop after finding this many chains
 
-@dataclass
+
+@dataclass(slots=True)
 class ShellChain:
     """A detected layered shell network chain."""
     members: List[str]       # All accounts in the chain (source → ... → destination)
@@ -41,7 +54,10 @@ class ShellChain:
     chain_length: int        # Number of hops
 
 
-def detect_shell_networks(graph: TransactionGraph) -> List[ShellChain]:
+def detect_shell_networks(
+    graph: TransactionGraph,
+    deadline: Optional[float] = None,
+) -> List[ShellChain]:
     """
     Find chains of 3+ directed hops where intermediate accounts
     have low total transaction counts (2-3 total), indicating
@@ -49,32 +65,71 @@ def detect_shell_networks(graph: TransactionGraph) -> List[ShellChain]:
 
     Args:
         graph: TransactionGraph with adjacency lists and stats.
+        deadline: time.monotonic() value to give up at, if any.
 
     Returns:
         List of ShellChain objects.
+
+    Raises:
+        DetectorTimeout: If the deadline passes before the search is done.
     """
-    results: List[ShellChain] = []
-    seen_chains: Set[tuple] = set()
+    csr = graph.csr
+    ids = csr.ids
+    # 1 where the node is shell-like, so each check is a single index
+    shell_mask = bytearray(
+        1 if _is_shell_account(csr.in_degree[v] + csr.out_degree[v]) else 0
+        for v in range(csr.node_count)
+    )
+    reach = _shell_reach(csr, shell_mask)
+
+    chains: List[tuple] = []
+    iteration_count = 0
+
+    # Path / cursor / visited buffers shared by every DFS (contiguous int
+    # buffers, so the hot loop allocates nothing per step)
+    path = array("i", [0]) * (MAX_CHAIN_HOPS + 1)    # path[k] = node at hop k
+    cursor = array("i", [0]) * (MAX_CHAIN_HOPS + 1)  # cursor[k] = next edge offset of path[k]
+    visited = bytearray(csr.node_count)
 
-    for start_node in graph.nodes:
+    for start_node in range(csr.node_count):
         # Only start from nodes that are NOT shell-like themselves
         # (shells are intermediaries, not originators)
-        start_stats = graph.stats.get(start_node)
-        if start_stats and _is_shell_account(start_stats.total_degree):
+        if shell_mask[start_node]:
             continue
+        if len(chains) >= MAX_SHELL_CHAINS or iteration_count >= MAX_ITERATIONS:
+            break
+        # Most start nodes take only a handful of steps, so the DFS's own
+        # periodic check alone could go a long time without firing
+        check_deadline(deadline)
 
-        # DFS to find chains through shell intermediaries
-        _find_chains(
-            graph=graph,
-            current=start_node,
-            path=[start_node],
-            visited={start_node},
-            shells_in_path=[],
-            results=results,
-            seen=seen_chains,
+        # DFS to find chains through shell intermediaries; the longest chain
+        # to each end node is only emitted once the whole DFS is done
+        best: Dict[int, Tuple[tuple, tuple]] = {}
+        iteration_count += _find_chains(
+            csr=csr,
+            shell_mask=shell_mask,
+            reach=reach,
+            start=start_node,
+            path=path,
+            cursor=cursor,
+            visited=visited,
+            best=best,
+            budget=MAX_ITERATIONS - iteration_count,
+            deadline=deadline,
         )
+        chains.extend(best.values())
 
-    return results
+    del chains[MAX_SHELL_CHAINS:]
+
+    # Convert index chains back to account IDs
+    return [
+        ShellChain(
+            members=[ids[i] for i in path],
+            shell_accounts=[ids[i] for i in shells],
+            chain_length=len(path) - 1,
+        )
+        for path, shells in chains
+    ]
 
 
 def _is_shell_account(total_degree: int) -> bool:
@@ -82,85 +137,154 @@ def _is_shell_account(total_degree: int) -> bool:
     return MIN_SHELL_DEGREE <= total_degree <= MAX_SHELL_DEGREE
 
 
+def _shell_reach(csr: CSRGraph, shell_mask: bytearray) -> array:
+    """
+    For each shell node, how many more hops a chain can still grow after
+    entering it: through further shells, plus one final hop to any node.
+    Capped at MIN_CHAIN_HOPS, which is all _find_chains needs to know.
+
+    Ignores the no-revisit rule, so it can over-estimate but never
+    under-estimate — pruning on it never drops a real chain.
+
+    Args:
+        csr: Integer-indexed CSR graph.
+        shell_mask: 1 per shell-like node index.
+
+    Returns:
+        Remaining-hop bound per node index (0 for non-shell nodes).
+    """
+    row_ptr, col_idx = csr.row_ptr, csr.col_idx
+    shells = [v for v in range(csr.node_count) if shell_mask[v]]
+    reach = array("i", bytes(4 * csr.node_count))
+
+    # Each round extends the bound by one hop
+    for _ in range(MIN_CHAIN_HOPS):
+        updated = array("i", reach)
+        for v in shells:
+            best = 0
+            for j in range(row_ptr[v], row_ptr[v + 1]):
+                w = col_idx[j]
+                hops = 1 + reach[w] if shell_mask[w] else 1
+                if hops > best:
+                    best = hops
+            updated[v] = min(best, MIN_CHAIN_HOPS)
+        reach = updated
+
+    return reach
+
+
 def _find_chains(
-    graph: TransactionGraph,
-    current: str,
-    path: List[str],
-    visited: Set[str],
-    shells_in_path: List[str],
-    results: List[ShellChain],
-    seen: Set[tuple],
-) -> None:
+    csr: CSRGraph,
+    shell_mask: bytearray,
+    reach: array,
+    start: int,
+    path: array,
+    cursor: array,
+    visited: bytearray,
+    best: Dict[int, Tuple[tuple, tuple]],
+    budget: int,
+    deadline: Optional[float] = None,
+) -> int:
     """
-    Recursive DFS to find chains through shell (low-degree) intermediaries.
+    Iterative DFS from one start node to find chains through shell
+    (low-degree) intermediaries, keeping the longest chain to each end node.
 
     A chain is valid when:
     - It has at least MIN_CHAIN_HOPS hops (edges, not nodes)
     - Intermediate nodes (not first or last) are shell-like
 
+    Only shells are ever pushed onto the path, so the shell accounts of
+    a chain are simply every node after the start.
+
     Args:
-        graph: Transaction graph.
-        current: Current node in traversal.
-        path: Current path from start.
-        visited: Nodes in current path.
-        shells_in_path: Shell accounts encountered so far.
-        results: Accumulator for results.
-        seen: Deduplication set.
+        csr: Integer-indexed CSR graph.
+        shell_mask: 1 per shell-like node index.
+        reach: Remaining-hop bound per shell node (see _shell_reach).
+        start: Non-shell start node index.
+        path: Shared path buffer, MAX_CHAIN_HOPS + 1 long.
+        cursor: Shared per-hop edge cursor buffer, same length as path.
+        visited: Per-node flag, 1 while the node is on the current path;
+                 left all-zero on return.
+        best: End node index → longest (path, shells) index tuple so far.
+        budget: DFS steps this call may still take.
+        deadline: time.monotonic() value to give up at, if any.
+
+    Returns:
+        Number of DFS steps taken.
     """
-    # Check if current path is a valid chain (at least MIN_CHAIN_HOPS edges)
-    hops = len(path) - 1
-    if hops >= MIN_CHAIN_HOPS and len(shells_in_path) >= 1:
-        chain_key = tuple(path)
-        if chain_key not in seen:
-            seen.add(chain_key)
-            results.append(ShellChain(
-                members=list(path),
-                shell_accounts=list(shells_in_path),
-                chain_length=hops,
-            ))
-
-    # Stop extending if we've reached max depth
-    if hops >= MAX_CHAIN_HOPS:
-        return
-
-    # Extend path through neighbors
-    for neighbor in graph.get_neighbors(current):
-        if neighbor in visited:
+    row_ptr, col_idx = csr.row_ptr, csr.col_idx
+
+    path[0] = start
+    cursor[0] = row_ptr[start]
+    visited[start] = 1
+    depth = 1
+    iteration_count = 0
+
+    while depth:
+        iteration_count += 1
+        if iteration_count > budget:
+            break
+        if not iteration_count % CHECK_INTERVAL:
+            check_deadline(deadline)
+
+        top = depth - 1
+        current = path[top]
+        pos = cursor[top]
+
+        # All neighbors exhausted — backtrack
+        if pos >= row_ptr[current + 1]:
+            visited[current] = 0
+            depth -= 1
             continue
 
-        neighbor_stats = graph.stats.get(neighbor)
-        if not neighbor_stats:
+        neighbor = col_idx[pos]
+        cursor[top] = pos + 1
+        if visited[neighbor]:
             continue
 
-        # The neighbor becomes an intermediate node
-        # Check if it's shell-like
-        is_shell = _is_shell_account(neighbor_stats.total_degree)
+        hops = top  # hops on the path so far
 
-        # We continue the chain if:
-        # 1. The neighbor is a shell account (extend through it), OR
-        # 2. The neighbor is a non-shell (could be the endpoint of the chain)
-        #    but only if we already have shell intermediaries
+        if shell_mask[neighbor]:
+            # Skip shells whose onward paths can't make the chain long enough
+            if hops + 1 + reach[neighbor] < MIN_CHAIN_HOPS:
+                continue
 
-        if is_shell:
             # Extend through shell intermediary
-            visited.add(neighbor)
-            path.append(neighbor)
-            shells_in_path.append(neighbor)
-            _find_chains(graph, neighbor, path, visited, shells_in_path, results, seen)
-            shells_in_path.pop()
-            path.pop()
-            visited.remove(neighbor)
-        elif len(shells_in_path) >= 1 and hops >= MIN_CHAIN_HOPS - 1:
+            path[depth] = neighbor
+            if hops + 1 >= MIN_CHAIN_HOPS:
+                _record_chain(path, depth + 1, depth + 1, best)
+
+            # Stop extending once we've reached max depth
+            if hops + 1 < MAX_CHAIN_HOPS:
+                cursor[depth] = row_ptr[neighbor]
+                visited[neighbor] = 1
+                depth += 1
+        elif hops >= 1 and hops >= MIN_CHAIN_HOPS - 1:
             # Non-shell neighbor as endpoint (we have enough shells already)
-            visited.add(neighbor)
-            path.append(neighbor)
-            chain_key = tuple(path)
-            if chain_key not in seen:
-                seen.add(chain_key)
-                results.append(ShellChain(
-                    members=list(path),
-                    shell_accounts=list(shells_in_path),
-                    chain_length=len(path) - 1,
-                ))
-            path.pop()
-            visited.remove(neighbor)
+            path[depth] = neighbor
+            _record_chain(path, depth + 1, depth, best)
+
+    # Clear whatever is left on the path if the budget cut the DFS short
+    for k in range(depth):
+        visited[path[k]] = 0
+
+    return min(iteration_count, budget)
+
+
+def _record_chain(
+    path: array,
+    length: int,
+    shells_end: int,
+    best: Dict[int, Tuple[tuple, tuple]],
+) -> None:
+    """
+    Keep path[:length] if it is the longest chain to its end node so far.
+
+    path[1:shells_end] are its shell accounts: every node after the start,
+    minus the end node when that is a non-shell endpoint.
+    """
+    end = path[length - 1]
+    current = best.get(end)
+    if current is None or len(current[0]) < length:
+        chain_key = tuple(path[:length])
+        best[end] = (chain_key, chain_key[1:shells_end])
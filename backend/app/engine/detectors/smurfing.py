@@ -9,24 +9,34 @@ Detection rules:
     Fan-out: 1 sender → ≥10 unique receivers within a 72-hour window
 
 Algorithm:
-    - For each node, collect incoming (or outgoing) transactions
-    - Sort by timestamp
+    - For each node, take its incoming (or outgoing) transactions from the
+      per-edge CSR rows: counterparty indices plus integer timestamps,
+      already sorted by timestamp when the CSR is built
     - Use a sliding 72-hour window to count unique counterparties
     - Flag the node + its counterparties if threshold is met
+    - Optional wall-clock deadline, checked between candidates
 """
 
 from __future__ import annotations
+from array import array
 from dataclasses import dataclass
-from datetime import timedelta
-from typing import List, Dict, Set, Tuple
-from ..graph import TransactionGraph, Edge
+from typing import List, Optional, Tuple
+from ..graph import TransactionGraph
+from .timeout import CHECK_INTERVAL, check_deadline
 
 
 WINDOW_HOURS = 72
 THRESHOLD = 10  # Minimum unique counterparties to flag
 
+WINDOW_SECONDS = WINDOW_HOURS * 3600  # Same window on the CSR's integer timestamps
 
-@dataclass
+# Pattern codes returned by _scan_candidates
+_FAN_IN = 0
+_FAN_OUT = 1
+_PATTERN_NAMES = ("fan_in", "fan_out")
+
+
+@dataclass(slots=True)
 class SmurfingRing:
     """A detected smurfing pattern."""
     hub_account: str          # The aggregator/disperser node
@@ -35,120 +45,207 @@ class SmurfingRing:
     members: List[str]        # hub + counterparties (all ring members)
 
 
-def detect_smurfing(graph: TransactionGraph) -> List[SmurfingRing]:
+def detect_smurfing(
+    graph: TransactionGraph,
+    deadline: Optional[float] = None,
+) -> List[SmurfingRing]:
     """
     Detect fan-in and fan-out smurfing patterns using 72-hour temporal windows.
 
     Args:
         graph: TransactionGraph with adjacency lists.
+        deadline: time.monotonic() value to give up at, if any.
 
     Returns:
         List of SmurfingRing objects.
+
+    Raises:
+        DetectorTimeout: If the deadline passes before the scan is done.
     """
+    csr = graph.csr
+    in_degree, out_degree = csr.in_degree, csr.out_degree
+
+    # Only accounts with THRESHOLD+ transactions in some direction can
+    # reach THRESHOLD unique counterparties; everything else is skipped
+    # before the scan
+    candidates = array("i", (
+        v for v in range(csr.node_count)
+        if in_degree[v] >= THRESHOLD or out_degree[v] >= THRESHOLD
+    ))
+
+    hubs, patterns, partners_flat, lengths = _scan_candidates(
+        candidates,
+        csr.in_ptr, csr.in_peers, csr.in_times,
+        csr.out_ptr, csr.out_peers, csr.out_times,
+        csr.node_count,
+        deadline,
+    )
+
+    # Convert index rings back to account IDs
+    ids = csr.ids
     results: List[SmurfingRing] = []
-    
-    # Track already-flagged hubs to avoid duplicate rings
-    flagged_fan_in: Set[str] = set()
-    flagged_fan_out: Set[str] = set()
-
-    for node in graph.nodes:
-        # --- Fan-in: many senders → this node ---
-        incoming = graph.get_incoming_edges(node)
-        if len(incoming) >= THRESHOLD and node not in flagged_fan_in:
-            fan_in_partners = _check_temporal_window(incoming)
-            if fan_in_partners:
-                flagged_fan_in.add(node)
-                members = [node] + list(fan_in_partners)
-                results.append(SmurfingRing(
-                    hub_account=node,
-                    counterparties=list(fan_in_partners),
-                    pattern="fan_in",
-                    members=members,
-                ))
-
-        # --- Fan-out: this node → many receivers ---
-        outgoing = graph.get_outgoing_edges(node)
-        if len(outgoing) >= THRESHOLD and node not in flagged_fan_out:
-            fan_out_partners = _check_temporal_window_outgoing(outgoing)
-            if fan_out_partners:
-                flagged_fan_out.add(node)
-                members = [node] + list(fan_out_partners)
-                results.append(SmurfingRing(
-                    hub_account=node,
-                    counterparties=list(fan_out_partners),
-                    pattern="fan_out",
-                    members=members,
-                ))
-
+    offset = 0
+    for hub, pattern, length in zip(hubs, patterns, lengths):
+        counterparties = [ids[i] for i in partners_flat[offset:offset + length]]
+        results.append(SmurfingRing(
+            hub_account=ids[hub],
+            counterparties=counterparties,
+            pattern=_PATTERN_NAMES[pattern],
+            members=[ids[hub]] + counterparties,
+        ))
+        offset += length
     return results
 
 
-def _check_temporal_window(edges: List[Edge]) -> Set[str] | None:
+def _scan_candidates(
+    candidates: array,
+    in_ptr: array,
+    in_peers: array,
+    in_times: array,
+    out_ptr: array,
+    out_peers: array,
+    out_times: array,
+    node_count: int,
+    deadline: Optional[float] = None,
+) -> Tuple[array, array, array, array]:
     """
-    Check if ≥THRESHOLD unique counterparties (edge.target = sender via reverse adj)
-    exist within any 72-hour window.
+    Run the fan-in and fan-out window checks for every candidate node.
+
+    Works purely on int arrays and returns flat int arrays, like the cycle
+    detector's DFS kernel. Candidates are independent of each other, so
+    the loop could also be split across workers without coordination.
 
     Args:
-        edges: Incoming edges (from reverse adjacency — edge.target is the sender).
+        candidates: Node indices to check, in ascending order.
+        in_ptr / in_peers / in_times: Incoming CSR edge rows.
+        out_ptr / out_peers / out_times: Outgoing CSR edge rows.
+        node_count: Number of nodes (sizes the scratch counters).
+        deadline: time.monotonic() value to give up at, if any.
 
     Returns:
-        Set of counterparty IDs if threshold met, else None.
+        (hubs, patterns, partners_flat, lengths) — per detected ring its
+        hub index and pattern code (_FAN_IN / _FAN_OUT), plus the
+        counterparty indices of every ring concatenated and how many
+        belong to each ring.
     """
-    if len(edges) < THRESHOLD:
-        return None
+    hubs = array("i")
+    patterns = array("b")
+    partners_flat = array("i")
+    lengths = array("i")
 
-    # Sort by timestamp
-    sorted_edges = sorted(edges, key=lambda e: e.timestamp)
-    window = timedelta(hours=WINDOW_HOURS)
+    # Scratch per-counterparty counters shared by every window scan
+    counts = array("i", bytes(4 * node_count))
 
-    best_partners: Set[str] = set()
+    # Each node index is visited once, so a hub can't be flagged twice.
+    # A candidate only qualifies in one direction more often than not, so
+    # each direction is gated on its row length before the window call
+    for k, node in enumerate(candidates):
+        if not k % CHECK_INTERVAL:
+            check_deadline(deadline)
 
-    # Sliding window approach
-    left = 0
-    for right in range(len(sorted_edges)):
-        # Shrink window from left if outside 72h
-        while sorted_edges[right].timestamp - sorted_edges[left].timestamp > window:
-            left += 1
-
-        # Collect unique counterparties in current window
-        current_partners = set()
-        for i in range(left, right + 1):
-            current_partners.add(sorted_edges[i].target)
-
-        if len(current_partners) >= THRESHOLD and len(current_partners) > len(best_partners):
-            best_partners = current_partners
+        # --- Fan-in: many senders → this node ---
+        start, end = in_ptr[node], in_ptr[node + 1]
+        fan_in_partners = (
+            _check_temporal_window(in_peers, in_times, start, end, counts)
+            if end - start >= THRESHOLD else None
+        )
+        if fan_in_partners:
+            hubs.append(node)
+            patterns.append(_FAN_IN)
+            partners_flat.extend(fan_in_partners)
+            lengths.append(len(fan_in_partners))
 
-    return best_partners if len(best_partners) >= THRESHOLD else None
+        # --- Fan-out: this node → many receivers ---
+        start, end = out_ptr[node], out_ptr[node + 1]
+        fan_out_partners = (
+            _check_temporal_window(out_peers, out_times, start, end, counts)
+            if end - start >= THRESHOLD else None
+        )
+        if fan_out_partners:
+            hubs.append(node)
+            patterns.append(_FAN_OUT)
+            partners_flat.extend(fan_out_partners)
+            lengths.append(len(fan_out_partners))
+
+    return hubs, patterns, partners_flat, lengths
+
+
+def _check_temporal_window(
+    peers: array,
+    times: array,
+    start: int,
+    end: int,
+    counts: array,
+) -> array | None:
+    """
+    Check if ≥THRESHOLD unique counterparties exist within any 72-hour
+    window of one account's CSR edge row.
 
+    Used for both directions: over the incoming rows the peers are
+    senders, over the outgoing rows they are receivers.
 
-def _check_temporal_window_outgoing(edges: List[Edge]) -> Set[str] | None:
-    """
-    Check if ≥THRESHOLD unique receivers exist within any 72-hour window.
+    Works purely on int arrays: counts[peer] holds how many of the
+    window's edges go to each counterparty, and a running total of the
+    non-zero entries is the unique count, so sliding the window is a few
+    integer updates per edge with no hashing or per-step allocation.
+    Stops at the first window that qualifies.
 
     Args:
-        edges: Outgoing edges (edge.target = receiver).
+        peers: Counterparty node index per edge (CSR in_peers / out_peers).
+        times: Timestamp per edge, in seconds (CSR in_times / out_times).
+        start: First edge of the account's row (rows are sorted by time).
+        end: One past the last edge of the row.
+        counts: Per-node scratch counters, all zero; left all-zero on return.
 
     Returns:
-        Set of receiver IDs if threshold met, else None.
+        Distinct counterparty node indices of the first qualifying window,
+        in order of first appearance, if threshold met, else None.
     """
-    if len(edges) < THRESHOLD:
+    if end - start < THRESHOLD:
         return None
 
-    sorted_edges = sorted(edges, key=lambda e: e.timestamp)
-    window = timedelta(hours=WINDOW_HOURS)
-
-    best_partners: Set[str] = set()
+    # A window can only reach THRESHOLD unique counterparties if it holds
+    # THRESHOLD edges, i.e. some run of THRESHOLD consecutive (time-sorted)
+    # edges spans ≤ 72h. That is one subtraction per edge with no counter
+    # updates, and rules out most rows before the full scan below. No
+    # qualifying window can start before the first such run, either
+    span = THRESHOLD - 1
+    for first in range(start, end - span):
+        if times[first + span] - times[first] <= WINDOW_SECONDS:
+            break
+    else:
+        return None
 
-    left = 0
-    for right in range(len(sorted_edges)):
-        while sorted_edges[right].timestamp - sorted_edges[left].timestamp > window:
-            left += 1
+    unique = 0
+    partners: array | None = None
 
-        current_partners = set()
-        for i in range(left, right + 1):
-            current_partners.add(sorted_edges[i].target)
+    # Sliding window approach (the row is already in timestamp order)
+    left = first
+    for right in range(first, end):
+        peer = peers[right]
+        if counts[peer] == 0:
+            unique += 1
+        counts[peer] += 1
 
-        if len(current_partners) >= THRESHOLD and len(current_partners) > len(best_partners):
-            best_partners = current_partners
+        # Shrink window from left if outside 72h
+        while times[right] - times[left] > WINDOW_SECONDS:
+            peer = peers[left]
+            counts[peer] -= 1
+            if counts[peer] == 0:
+                unique -= 1
+            left += 1
 
-    return best_partners if len(best_partners) >= THRESHOLD else None
+        # Any window meeting the threshold flags the account — stop here
+        if unique >= THRESHOLD:
+            partners = array("i")
+            for k in range(left, right + 1):
+                peer = peers[k]
+                if counts[peer]:
+                    counts[peer] = 0
+                    partners.append(peer)
+            return partners
+
+    # Hand the scratch counters back zeroed for the next row
+    for k in range(left, end):
+        counts[peers[k]] = 0
+    return None
@@ -0,0 +1,24 @@
+"""
+Deadline support shared by the detectors.
+
+Each detector takes an optional deadline (a time.monotonic() value) and
+checks it periodically inside its search loops, raising DetectorTimeout
+once it has passed, so a detector run in-process can still be cut short.
+"""
+
+import time
+from typing import Optional
+
+# Loop steps between deadline checks in the detectors' hot loops, so
+# reading the clock stays a negligible share of each step
+CHECK_INTERVAL = 1024
+
+
+class DetectorTimeout(Exception):
+    """Raised inside a detector once its deadline has passed."""
+
+
+def check_deadline(deadline: Optional[float]) -> None:
+    """Raise DetectorTimeout if deadline is set and has passed."""
+    if deadline is not None and time.monotonic() > deadline:
+        raise DetectorTimeout()
@@ -7,22 +7,14 @@ Builds an adjacency-list representation where:
 """
 
 from __future__ import annotations
+from array import array
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Dict, List, Set
-from .parser import Transaction
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple, Union
+from .parser import CSVParseError, NO_TRANSACTIONS_MESSAGE, TransactionBatch, iter_transactions
 
 
-@dataclass
-class Edge:
-    """A directed edge in the transaction graph."""
-    target: str
-    amount: float
-    timestamp: datetime
-    transaction_id: str
 
-
-@dataclass
+@dataclass(slots=True)
 class NodeStats:
     """Pre-computed statistics for a node."""
     in_degree: int = 0
@@ -39,58 +31,129 @@ class NodeStats:
         return self.in_degree + self.out_degree
 
 
+@dataclass(slots=True)
+class CSRGraph:
+    """
+    Integer-indexed Compressed Sparse Row view of a TransactionGraph.
+
+    Node i's outgoing neighbors are col_idx[row_ptr[i]:row_ptr[i + 1]],
+    sorted ascending with repeated transactions to the same account
+    collapsed into one entry. Node indices follow the sorted order of
+    account IDs, so comparing two indices gives the same result as
+    comparing the IDs themselves.
+
+    Alongside that distinct-neighbor view, every transaction is kept as a
+    per-edge row in both directions, for detectors that need timestamps:
+    node i's outgoing transactions are out_peers[out_ptr[i]:out_ptr[i + 1]]
+    (receivers) at out_times[...] — likewise in_ptr / in_peers (senders) /
+    in_times for its incoming ones — sorted by timestamp, ties in
+    transaction order.
+
+    Attributes:
+        ids:      Account ID for each node index.
+        index:    Account ID → node index.
+        row_ptr:  int32 offsets into col_idx, length n + 1.
+        col_idx:  int32 target node indices, length m.
+        in_degree:  int32 incoming transaction count per node index.
+        out_degree: int32 outgoing transaction count per node index.
+        out_ptr / in_ptr:     int32 offsets into the per-edge rows, length n + 1.
+        out_peers / in_peers: int32 counterparty node index per transaction.
+        out_times / in_times: int64 timestamp per transaction, in seconds
+                              since the parser's EPOCH.
+    """
+    ids: List[str]
+    index: Dict[str, int]
+    row_ptr: array
+    col_idx: array
+    in_degree: array
+    out_degree: array
+    out_ptr: array
+    out_peers: array
+    out_times: array
+    in_ptr: array
+    in_peers: array
+    in_times: array
+
+    @property
+    def node_count(self) -> int:
+        return len(self.ids)
+
+
 class TransactionGraph:
     """
     Directed graph built from transaction records.
 
+    Edges are stored column-wise (struct-of-arrays): edge k is
+    edge_sources[k] → edge_targets[k], moving edge_amounts[k] at
+    edge_timestamps[k] (seconds since the parser's EPOCH), for
+    transaction edge_ids[k].
+
     Attributes:
-        adj:        Adjacency list — adj[sender] = [Edge, ...]
-        reverse_adj: Reverse adjacency — reverse_adj[receiver] = [Edge(target=sender), ...]
+        edge_sources / edge_targets / edge_amounts / edge_timestamps / edge_ids:
+                    Parallel edge columns, in transaction order.
+        out_edges:  Forward adjacency — out_edges[sender] = positions of its edges
+        in_edges:   Reverse adjacency — in_edges[receiver] = positions of its edges
         nodes:      Set of all unique account IDs.
         stats:      Per-node statistics (in/out degree, amounts).
-        incoming:   incoming[receiver] = [(sender, amount, timestamp, txn_id), ...]
+        csr:        Integer-indexed CSR view, built once on first access.
     """
 
     def __init__(self) -> None:
-        self.adj: Dict[str, List[Edge]] = {}
-        self.reverse_adj: Dict[str, List[Edge]] = {}
+        self.edge_sources: List[str] = []
+        self.edge_targets: List[str] = []
+        self.edge_amounts: array = array("d")
+        self.edge_timestamps: array = array("q")
+        self.edge_ids: List[str] = []
+        self.out_edges: Dict[str, array] = {}
+        self.in_edges: Dict[str, array] = {}
         self.nodes: Set[str] = set()
         self.stats: Dict[str, NodeStats] = {}
-        self.incoming: Dict[str, List[tuple]] = {}
+        self._csr: Optional[CSRGraph] = None
+
+    @classmethod
+    def from_csr(cls, csr: CSRGraph) -> TransactionGraph:
+        """
+        Graph holding only a prebuilt CSR view, with empty edge columns.
 
-    def add_transaction(self, txn: Transaction) -> None:
+        Enough for the detectors, which read nothing but graph.csr; lets a
+        worker process be sent the compact CSR arrays rather than the
+        whole graph.
+        """
+        graph = cls()
+        graph._csr = csr
+        return graph
+
+    def add_transaction(
+        self,
+        transaction_id: str,
+        sender: str,
+        receiver: str,
+        amount: float,
+        timestamp: int,
+    ) -> None:
         """Add a single transaction as a directed edge."""
-        sender = txn.sender_id
-        receiver = txn.receiver_id
+        # Any cached CSR view no longer matches
+        self._csr = None
 
         # Register nodes
         self.nodes.add(sender)
         self.nodes.add(receiver)
 
-        # Forward edge: sender → receiver
-        if sender not in self.adj:
-            self.adj[sender] = []
-        self.adj[sender].append(Edge(
-            target=receiver,
-            amount=txn.amount,
-            timestamp=txn.timestamp,
-            transaction_id=txn.transaction_id,
-        ))
+        # Forward edge: sender → receiver, appended to the edge columns
+        position = len(self.edge_ids)
+        self.edge_sources.append(sender)
+        self.edge_targets.append(receiver)
+        self.edge_amounts.append(amount)
+        self.edge_timestamps.append(timestamp)
+        self.edge_ids.append(transaction_id)
+        if sender not in self.out_edges:
+            self.out_edges[sender] = array("i")
+        self.out_edges[sender].append(position)
 
         # Reverse edge: receiver ← sender (for fan-in analysis)
-        if receiver not in self.reverse_adj:
-            self.reverse_adj[receiver] = []
-        self.reverse_adj[receiver].append(Edge(
-            target=sender,
-            amount=txn.amount,
-            timestamp=txn.timestamp,
-            transaction_id=txn.transaction_id,
-        ))
-
-        # Track incoming transactions per receiver
-        if receiver not in self.incoming:
-            self.incoming[receiver] = []
-        self.incoming[receiver].append((sender, txn.amount, txn.timestamp, txn.transaction_id))
+        if receiver not in self.in_edges:
+            self.in_edges[receiver] = array("i")
+        self.in_edges[receiver].append(position)
 
         # Update stats
         if sender not in self.stats:
@@ -99,21 +162,33 @@ class TransactionGraph:
             self.stats[receiver] = NodeStats()
 
         self.stats[sender].out_degree += 1
-        self.stats[sender].total_out_amount += txn.amount
+        self.stats[sender].total_out_amount += amount
         self.stats[receiver].in_degree += 1
-        self.stats[receiver].total_in_amount += txn.amount
+        self.stats[receiver].total_in_amount += amount
 
     def get_neighbors(self, node: str) -> List[str]:
         """Get outgoing neighbors of a node."""
-        return [e.target for e in self.adj.get(node, [])]
+        targets = self.edge_targets
+        return [targets[k] for k in self.out_edges.get(node, ())]
+
+    def get_outgoing_edges(self, node: str) -> array:
+        """Get positions (into the edge columns) of a node's outgoing edges."""
+        return self.out_edges.get(node, array("i"))
 
-    def get_outgoing_edges(self, node: str) -> List[Edge]:
-        """Get outgoing edges from a node."""
-        return self.adj.get(node, [])
+    def get_incoming_edges(self, node: str) -> array:
+        """Get positions (into the edge columns) of a node's incoming edges."""
+        return self.in_edges.get(node, array("i"))
 
-    def get_incoming_edges(self, node: str) -> List[Edge]:
-        """Get incoming edges to a node (via reverse adjacency)."""
-        return self.reverse_adj.get(node, [])
+    def build_csr(self) -> CSRGraph:
+        """Build the CSR view now if it isn't cached yet, and return it."""
+        if self._csr is None:
+            self._csr = to_csr(self)
+        return self._csr
+
+    @property
+    def csr(self) -> CSRGraph:
+        """CSR view shared by every detector, so the re-encoding runs once."""
+        return self.build_csr()
 
     @property
     def node_count(self) -> int:
@@ -121,20 +196,156 @@ class TransactionGraph:
 
     @property
     def edge_count(self) -> int:
-        return sum(len(edges) for edges in self.adj.values())
+        # One entry per edge in each column, so no need to walk adjacency
+        return len(self.edge_ids)
+
+
+def build_graph(transactions: TransactionBatch) -> TransactionGraph:
+    """
+    Construct a directed graph from a batch of transactions.
+
+    Args:
+        transactions: Column-wise batch of parsed transactions.
+
+    Returns:
+        A TransactionGraph with adjacency lists and pre-computed stats.
+    """
+    graph = TransactionGraph()
+    for row in zip(
+        transactions.transaction_ids,
+        transactions.sender_ids,
+        transactions.receiver_ids,
+        transactions.amounts,
+        transactions.timestamps,
+    ):
+        graph.add_transaction(*row)
+    return graph
 
 
-def build_graph(transactions: List[Transaction]) -> TransactionGraph:
+def parse_and_build(content: Union[bytes, BinaryIO]) -> TransactionGraph:
     """
-    Construct a directed graph from a list of transactions.
+    Parse raw CSV bytes straight into a graph in one streaming pass.
+
+    Same result as build_graph(parse_csv(content)), but each validated
+    row goes into the graph as soon as it is parsed, so no intermediate
+    TransactionBatch is held alongside the graph's own edge columns.
 
     Args:
-        transactions: List of parsed Transaction objects.
+        content: Raw CSV file bytes, or a binary file object positioned at
+            the start of the CSV (read incrementally).
 
     Returns:
         A TransactionGraph with adjacency lists and pre-computed stats.
+
+    Raises:
+        CSVParseError: If the CSV is malformed, missing columns, or has no
+            valid rows.
     """
     graph = TransactionGraph()
-    for txn in transactions:
-        graph.add_transaction(txn)
+    for row in iter_transactions(content):
+        graph.add_transaction(*row)
+
+    if not graph.edge_count:
+        raise CSVParseError(NO_TRANSACTIONS_MESSAGE)
+
     return graph
+
+
+def to_csr(graph: TransactionGraph) -> CSRGraph:
+    """
+    Re-encode the graph's adjacency lists as CSR arrays of node indices.
+
+    Detectors run their DFS and window scans over these flat int arrays
+    instead of hashing account ID strings and chasing edge objects on
+    every visit, and translate indices back to IDs only when building
+    results.
+
+    Args:
+        graph: A built TransactionGraph.
+
+    Returns:
+        A CSRGraph over the same nodes and edges.
+    """
+    ids = sorted(graph.nodes)
+    index = {node_id: i for i, node_id in enumerate(ids)}
+
+    n = len(ids)
+    sources = array("i", [index[node_id] for node_id in graph.edge_sources])
+    targets = array("i", [index[node_id] for node_id in graph.edge_targets])
+    times = graph.edge_timestamps
+
+    # Per-edge rows in both directions, bucketed by a stable counting sort.
+    # Edges are fed in timestamp order (one global sort), so every row
+    # comes out already sorted by time
+    order = sorted(range(len(times)), key=times.__getitem__)
+    out_ptr, out_peers, out_times = _bucket_edges(n, sources, targets, times, order)
+    in_ptr, in_peers, in_times = _bucket_edges(n, targets, sources, times, order)
+
+    row_ptr = array("i", bytes(4 * (n + 1)))
+    col_idx = array("i")
+    out_degree = array("i", bytes(4 * n))
+    in_degree = array("i", bytes(4 * n))
+    for i in range(n):
+        start, end = out_ptr[i], out_ptr[i + 1]
+        # Sorted, distinct targets: DFS scans each row in order and can
+        # skip straight past targets below a bound
+        col_idx.extend(sorted(set(out_peers[start:end])))
+        row_ptr[i + 1] = len(col_idx)
+        out_degree[i] = end - start
+        in_degree[i] = in_ptr[i + 1] - in_ptr[i]
+
+    return CSRGraph(
+        ids=ids,
+        index=index,
+        row_ptr=row_ptr,
+        col_idx=col_idx,
+        in_degree=in_degree,
+        out_degree=out_degree,
+        out_ptr=out_ptr,
+        out_peers=out_peers,
+        out_times=out_times,
+        in_ptr=in_ptr,
+        in_peers=in_peers,
+        in_times=in_times,
+    )
+
+
+def _bucket_edges(
+    n: int,
+    keys: array,
+    peers: array,
+    times: array,
+    order: List[int],
+) -> Tuple[array, array, array]:
+    """
+    Group edges into per-node rows by keys[k]; within a row, edges keep
+    the order in which they appear in `order`.
+
+    Args:
+        n: Number of nodes.
+        keys: Node index each edge is filed under.
+        peers: Node index at the other end of each edge.
+        times: Timestamp of each edge.
+        order: Edge positions in the order to file them.
+
+    Returns:
+        (ptr, row_peers, row_times) — row offsets per node, and the peers
+        and timestamps rearranged into those rows.
+    """
+    ptr = array("i", bytes(4 * (n + 1)))
+    for key in keys:
+        ptr[key + 1] += 1
+    for i in range(n):
+        ptr[i + 1] += ptr[i]
+
+    fill = array("i", ptr)
+    row_peers = array("i", bytes(4 * len(keys)))
+    row_times = array("q", bytes(8 * len(keys)))
+    for k in order:
+        key = keys[k]
+        slot = fill[key]
+        fill[key] = slot + 1
+        row_peers[slot] = peers[k]
+        row_times[slot] = times[k]
+
+    return ptr, row_peers, row_times
@@ -6,79 +6,154 @@ Expected CSV columns:
     sender_id       (str)
     receiver_id     (str)
     amount          (float)
-    timestamp       (datetime — YYYY-MM-DD HH:MM:SS)
+    timestamp       (datetime — YYYY-MM-DD HH:MM:SS; parsed to integer
+                     seconds since EPOCH)
 """
 
 import csv
 import io
-from datetime import datetime
-from dataclasses import dataclass
-from typing import List
+from array import array
+from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterator, List, Tuple, Union
 
 
-@dataclass
-class Transaction:
-    """A single parsed transaction record."""
-    transaction_id: str
-    sender_id: str
-    receiver_id: str
-    amount: float
-    timestamp: datetime
+@dataclass(slots=True)
+class TransactionBatch:
+    """
+    Parsed transaction records, stored column-wise (struct-of-arrays):
+    transaction k is sender_ids[k] → receiver_ids[k], moving amounts[k]
+    at timestamps[k] (seconds since EPOCH), with ID transaction_ids[k].
+    """
+    transaction_ids: List[str] = field(default_factory=list)
+    sender_ids: List[str] = field(default_factory=list)
+    receiver_ids: List[str] = field(default_factory=list)
+    amounts: array = field(default_factory=lambda: array("d"))
+    timestamps: array = field(default_factory=lambda: array("q"))
+
+    def __len__(self) -> int:
+        return len(self.transaction_ids)
 
 
 REQUIRED_COLUMNS = {"transaction_id", "sender_id", "receiver_id", "amount", "timestamp"}
 
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Timestamps leave the parser as integer seconds since this (naive) epoch,
+# so everything downstream compares and stores plain ints
+EPOCH = datetime(1970, 1, 1)
+_ONE_SECOND = timedelta(seconds=1)
+
+
+NO_TRANSACTIONS_MESSAGE = "No valid transactions found in the CSV file."
+
 
 class CSVParseError(Exception):
     """Raised when the CSV file is invalid or malformed."""
     pass
 
 
-def parse_csv(content: bytes) -> List[Transaction]:
+def parse_csv(content: Union[bytes, BinaryIO]) -> TransactionBatch:
     """
-    Parse raw CSV bytes into a list of validated Transaction objects.
+    Parse raw CSV bytes into a column-wise batch of validated transactions.
 
     Args:
-        content: Raw CSV file bytes.
+        content: Raw CSV file bytes, or a binary file object positioned at
+            the start of the CSV.
 
     Returns:
-        List of Transaction objects.
+        TransactionBatch holding every valid row.
 
     Raises:
         CSVParseError: If the CSV is malformed, missing columns, or has invalid data.
     """
+    batch = TransactionBatch()
+    for txn_id, sender, receiver, amount, timestamp in iter_transactions(content):
+        batch.transaction_ids.append(txn_id)
+        batch.sender_ids.append(sender)
+        batch.receiver_ids.append(receiver)
+        batch.amounts.append(amount)
+        batch.timestamps.append(timestamp)
+
+    if not batch:
+        raise CSVParseError(NO_TRANSACTIONS_MESSAGE)
+
+    return batch
+
+
+def iter_transactions(
+    content: Union[bytes, BinaryIO],
+) -> Iterator[Tuple[str, str, str, float, int]]:
+    """
+    Validate raw CSV bytes row by row, yielding each valid transaction as
+    soon as it is parsed, so callers can consume rows without the whole
+    file being materialized first.
+
+    Args:
+        content: Raw CSV file bytes, or a binary file object positioned at
+            the start of the CSV. A file object is decoded and read
+            incrementally, so the file is never held in memory whole.
+
+    Yields:
+        (transaction_id, sender_id, receiver_id, amount, timestamp) per
+        valid row, timestamp in seconds since EPOCH.
+
+    Raises:
+        CSVParseError: If the file can't be decoded or the header is
+            missing or lacks required columns (raised on first iteration;
+            a decoding error further into the file is raised when reached).
+            An input with no valid rows simply yields nothing.
+    """
+    stream = io.BytesIO(content) if isinstance(content, bytes) else content
+    # Decoded lazily as the reader pulls lines; newline="" as the csv
+    # module expects, so quoted fields keep their embedded newlines
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
     try:
-        text = content.decode("utf-8")
+        yield from _iter_rows(csv.reader(text))
     except UnicodeDecodeError:
         raise CSVParseError("File is not valid UTF-8 encoded text.")
+    finally:
+        # Hand the caller's file object back open
+        text.detach()
+
 
-    reader = csv.DictReader(io.StringIO(text))
+def _iter_rows(reader: Iterator[List[str]]) -> Iterator[Tuple[str, str, str, float, int]]:
+    """Validate csv.reader rows; see iter_transactions."""
+    # Plain reader with column positions looked up once: no per-row dict
+    header = next(reader, None)
 
-    if reader.fieldnames is None:
+    if header is None:
         raise CSVParseError("CSV file is empty or has no header row.")
 
     # Normalize column names (strip whitespace, lowercase)
-    cleaned_fieldnames = [f.strip().lower() for f in reader.fieldnames]
+    cleaned_fieldnames = [f.strip().lower() for f in header]
     missing = REQUIRED_COLUMNS - set(cleaned_fieldnames)
     if missing:
         raise CSVParseError(f"Missing required columns: {', '.join(sorted(missing))}")
 
-    # Build column index mapping (handle case/whitespace variations)
+    # Build column index mapping (handle case/whitespace variations; a
+    # repeated column name resolves to its last occurrence)
     col_map = {}
-    for original, cleaned in zip(reader.fieldnames, cleaned_fieldnames):
+    for position, cleaned in enumerate(cleaned_fieldnames):
         if cleaned in REQUIRED_COLUMNS:
-            col_map[cleaned] = original
+            col_map[cleaned] = position
+    txn_col = col_map["transaction_id"]
+    sender_col = col_map["sender_id"]
+    receiver_col = col_map["receiver_id"]
+    amount_col = col_map["amount"]
+    ts_col = col_map["timestamp"]
 
-    transactions: List[Transaction] = []
     seen_ids: set = set()
+    # Intern table for account IDs, local to this parse
+    account_ids: Dict[str, str] = {}
 
-    for line_num, row in enumerate(reader, start=2):
+    for row in reader:
         try:
-            txn_id = row[col_map["transaction_id"]].strip()
-            sender = row[col_map["sender_id"]].strip()
-            receiver = row[col_map["receiver_id"]].strip()
-            amount_str = row[col_map["amount"]].strip()
-            ts_str = row[col_map["timestamp"]].strip()
+            txn_id = row[txn_col].strip()
+            sender = row[sender_col].strip()
+            receiver = row[receiver_col].strip()
+            amount_str = row[amount_col].strip()
+            ts_str = row[ts_col].strip()
 
             # Validate non-empty
             if not all([txn_id, sender, receiver, amount_str, ts_str]):
@@ -93,25 +168,47 @@ def parse_csv(content: bytes) -> List[Transaction]:
             if sender == receiver:
                 continue
 
+            # Intern account IDs: they recur across many rows and are used
+            # as dict/set keys throughout the graph and detectors, so every
+            # occurrence shares one object with a cached hash
+            sender = account_ids.setdefault(sender, sender)
+            receiver = account_ids.setdefault(receiver, receiver)
+
             # Parse amount
             amount = float(amount_str)
             if amount <= 0:
                 continue  # Skip zero/negative amounts
 
             # Parse timestamp
-            timestamp = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-
-            transactions.append(Transaction(
-                transaction_id=txn_id,
-                sender_id=sender,
-                receiver_id=receiver,
-                amount=amount,
-                timestamp=timestamp,
-            ))
-        except (ValueError, KeyError):
-            continue  # Skip malformed rows silently
-
-    if not transactions:
-        raise CSVParseError("No valid transactions found in the CSV file.")
-
-    return transactions
+            timestamp = (_parse_timestamp(ts_str) - EPOCH) // _ONE_SECOND
+
+        except (ValueError, IndexError):
+            continue  # Skip malformed (or short / blank) rows silently
+
+        yield txn_id, sender, receiver, amount, timestamp
+
+
+def _parse_timestamp(ts_str: str) -> datetime:
+    """
+    Parse a TIMESTAMP_FORMAT string.
+
+    The usual zero-padded, fixed-width form goes through the C-level
+    datetime.fromisoformat, which is many times faster than strptime.
+    The separator checks pin it to exactly YYYY-MM-DD HH:MM:SS, so no
+    other ISO 8601 variant gets through. Anything else, or anything the
+    fast path rejects, is left to strptime, so what is accepted doesn't
+    change (strptime also tolerates e.g. unpadded fields).
+
+    Raises:
+        ValueError: If the string is not a valid timestamp.
+    """
+    if (
+        len(ts_str) == 19
+        and ts_str[4] == "-" and ts_str[7] == "-" and ts_str[10] == " "
+        and ts_str[13] == ":" and ts_str[16] == ":"
+    ):
+        try:
+            return datetime.fromisoformat(ts_str)
+        except ValueError:
+            pass
+    return datetime.strptime(ts_str, TIMESTAMP_FORMAT)
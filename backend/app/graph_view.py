@@ -0,0 +1,126 @@
+"""
+Graph visualization payload for a stored analysis session.
+
+Builds the nodes / edges / rings structure served by
+GET /api/sessions/{id}/graph for the frontend GraphView component.
+It is computed once when a session is written and stored with it, and
+rebuilt from the stored rows only for sessions saved without one.
+"""
+
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (account_id, suspicion_score, ring_id, detected pattern names)
+AccountRow = Tuple[str, float, str, Sequence[str]]
+# (ring_id, pattern_type, member_count, risk_score, member account IDs)
+RingRow = Tuple[str, str, int, float, Sequence[str]]
+
+
+@lru_cache(maxsize=256)
+def normalize_pattern(raw: str) -> str:
+    """
+    Map a stored pattern name onto the graph view's pattern types:
+    layered_shell / shell_intermediary → shell, cycle_length_X → cycle,
+    fan_in / fan_out → smurfing; anything else is passed through.
+
+    Pattern names come from a small vocabulary, so each distinct name is
+    worked out once and every later node or ring is a cache lookup.
+    """
+    if "shell" in raw or "layered" in raw:
+        return "shell"
+    if "cycle" in raw:
+        return "cycle"
+    if "fan" in raw or "smurf" in raw:
+        return "smurfing"
+    return raw
+
+
+def build_graph_view(
+    accounts: Iterable[AccountRow],
+    rings: Iterable[RingRow],
+    created_at: Optional[datetime],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Reconstruct graph visualization data for a session.
+
+    Args:
+        accounts: The session's suspicious accounts.
+        rings: The session's fraud rings, with their members in order.
+        created_at: When the session was stored (naive UTC, as read back
+            from the database); stamped on every edge.
+
+    Returns:
+        {"nodes": [...], "edges": [...], "rings": [...]} — nodes (accounts),
+        edges (consecutive ring members) and ring metadata.
+    """
+    # Build nodes from suspicious accounts
+    nodes = []
+    account_set: set[str] = set()
+    for account_id, suspicion_score, ring_id, patterns in accounts:
+        pattern_type = None
+        if patterns:
+            pattern_type = normalize_pattern(patterns[0])
+
+        nodes.append({
+            "id": account_id,
+            "riskScore": suspicion_score,
+            "suspicious": True,
+            "ringId": ring_id,
+            "patternType": pattern_type,
+            "totalTransactions": 0,  # Not stored in DB, but not critical
+        })
+        account_set.add(account_id)
+
+    # Build rings and edges from fraud ring members; every edge carries
+    # the same timestamp, so it is formatted once
+    timestamp = created_at.isoformat() if created_at else ""
+    rings_out = []
+    edges = []
+    edge_counter = 0
+    for ring_id, pattern_type, member_count, risk_score, member_ids in rings:
+        pt = normalize_pattern(pattern_type)
+
+        rings_out.append({
+            "ringId": ring_id,
+            "patternType": pt,
+            "memberCount": member_count,
+            "riskScore": risk_score,
+            "members": list(member_ids),
+        })
+
+        # Rings with at least one edge add their non-suspicious members as
+        # nodes — once per ring, not once per edge
+        if len(member_ids) > 1:
+            new_members = [mid for mid in dict.fromkeys(member_ids) if mid not in account_set]
+            nodes.extend(
+                {
+                    "id": mid,
+                    "riskScore": 0,
+                    "suspicious": False,
+                    "ringId": ring_id,
+                    "patternType": pt,
+                    "totalTransactions": 0,
+                }
+                for mid in new_members
+            )
+            account_set.update(new_members)
+
+        # Create edges between consecutive members to show relationships
+        edges.extend(
+            {
+                "id": f"e_{edge_counter + i}",
+                "source": source,
+                "target": target,
+                "amount": 0,
+                "timestamp": timestamp,
+            }
+            for i, (source, target) in enumerate(zip(member_ids, member_ids[1:]), start=1)
+        )
+        edge_counter += max(len(member_ids) - 1, 0)
+
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "rings": rings_out,
+    }
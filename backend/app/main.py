@@ -9,6 +9,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from db.database import init_db
+from backend.app.engine.analyzer import start_detector_server
+from backend.app.responses import ORJSONResponse
 from backend.app.routes.sessions import router as sessions_router
 from backend.app.routes.upload import router as upload_router
 
@@ -16,8 +18,9 @@ from backend.app.routes.upload import router as upload_router
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup / shutdown lifecycle events."""
-    # Startup: create all DB tables
+    # Startup: create all DB tables, start the detector forkserver
     init_db()
+    start_detector_server()
     yield
     # Shutdown: cleanup if needed
 
@@ -27,6 +30,7 @@ app = FastAPI(
     description="Graph-based financial crime detection API",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS — allow frontend dev server
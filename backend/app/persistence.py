@@ -0,0 +1,109 @@
+"""
+Persistence of analysis results.
+
+Both POST /api/sessions and POST /api/upload store a result the same
+way: the session row, its suspicious accounts + patterns and fraud
+rings + members, and the materialized graph view — all through Core
+INSERTs in one transaction, without building ORM objects.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from db.bulk import insert_rows
+from db.models import (
+    AnalysisSession,
+    SuspiciousAccount,
+    DetectedPattern,
+    FraudRing,
+    RingMember,
+)
+from backend.app.graph_view import AccountRow, RingRow, build_graph_view
+
+
+def save_analysis(
+    db: Session,
+    filename: str,
+    summary: Dict[str, Any],
+    accounts: Sequence[AccountRow],
+    rings: Sequence[RingRow],
+) -> Tuple[uuid.UUID, datetime]:
+    """
+    Store one analysis result and commit it.
+
+    Args:
+        db: Session with no transaction in progress.
+        filename: Original CSV filename.
+        summary: The result's summary dict (total_accounts_analyzed,
+            suspicious_accounts_flagged, fraud_rings_detected,
+            processing_time_seconds).
+        accounts: Suspicious accounts, as graph_view.AccountRow tuples.
+        rings: Fraud rings, as graph_view.RingRow tuples.
+
+    Returns:
+        (session_id, created_at) of the stored session.
+    """
+    # Every id is generated up front, so child rows can reference their
+    # parent without reading ids back from the database
+    session_id = uuid.uuid4()
+    created_at = datetime.now(timezone.utc)
+
+    session_row = {
+        "id": session_id,
+        "filename": filename,
+        "total_accounts": summary["total_accounts_analyzed"],
+        "suspicious_count": summary["suspicious_accounts_flagged"],
+        "rings_detected": summary["fraud_rings_detected"],
+        "processing_time": summary["processing_time_seconds"],
+        "raw_summary": summary,
+        # Naive, as the stored created_at reads back
+        "graph_payload": build_graph_view(accounts, rings, created_at.replace(tzinfo=None)),
+        "created_at": created_at,
+    }
+
+    account_rows = []
+    pattern_rows = []
+    for account_id, suspicion_score, ring_id, patterns in accounts:
+        acct_id = uuid.uuid4()
+        account_rows.append({
+            "id": acct_id,
+            "session_id": session_id,
+            "account_id": account_id,
+            "suspicion_score": suspicion_score,
+            "ring_id": ring_id,
+        })
+        for pattern_name in patterns:
+            pattern_rows.append({
+                "suspicious_account_id": acct_id,
+                "pattern_name": pattern_name,
+            })
+
+    ring_rows = []
+    member_rows = []
+    for ring_id, pattern_type, member_count, risk_score, member_ids in rings:
+        fraud_ring_id = uuid.uuid4()
+        ring_rows.append({
+            "id": fraud_ring_id,
+            "session_id": session_id,
+            "ring_id": ring_id,
+            "pattern_type": pattern_type,
+            "risk_score": risk_score,
+            "member_count": member_count,
+        })
+        for member_id in member_ids:
+            member_rows.append({"fraud_ring_id": fraud_ring_id, "account_id": member_id})
+
+    with db.begin():
+        # One Core INSERT per table, parents before children; the child
+        # tables go in parameter-bounded executemany chunks
+        db.execute(insert(AnalysisSession.__table__), session_row)
+        insert_rows(db, SuspiciousAccount.__table__, account_rows)
+        insert_rows(db, DetectedPattern.__table__, pattern_rows)
+        insert_rows(db, FraudRing.__table__, ring_rows)
+        insert_rows(db, RingMember.__table__, member_rows)
+
+    return session_id, created_at
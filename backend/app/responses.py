@@ -0,0 +1,20 @@
+"""
+Response classes shared by the API routes.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson in a single native encode pass.
+
+    datetime values are written as ISO 8601 strings by orjson itself, so
+    handlers can return them without calling isoformat() first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
@@ -8,26 +8,51 @@ Endpoints:
     DELETE /api/sessions/{id}  — Delete a session (cascading)
 """
 
-import json
+import uuid
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, selectinload, undefer
 
 from db.database import get_db
-from db.models import (
-    AnalysisSession,
-    SuspiciousAccount,
-    DetectedPattern,
-    FraudRing,
-    RingMember,
-)
+from db.models import AnalysisSession, SuspiciousAccount, FraudRing
 from db.schemas import (
     AnalysisResultIn,
     SessionSummaryOut,
     SessionDetailOut,
 )
+from backend.app.graph_view import build_graph_view
+from backend.app.persistence import save_analysis
+from backend.app.responses import ORJSONResponse
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
+# Loads a session's accounts + patterns and rings + members alongside it,
+# one SELECT per table, for the handlers that walk the whole tree
+_WITH_CHILDREN = (
+    selectinload(AnalysisSession.suspicious_accounts)
+    .selectinload(SuspiciousAccount.detected_patterns),
+    selectinload(AnalysisSession.fraud_rings)
+    .selectinload(FraudRing.members),
+)
+
+
+def _parse_session_id(session_id: str) -> uuid.UUID:
+    """
+    Parse a {session_id} path parameter.
+
+    Taken as a plain string and parsed here, so an id that isn't a UUID
+    gets the same 404 as one that matches no session, rather than a
+    validation error.
+    """
+    try:
+        return uuid.UUID(session_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Session {session_id} not found",
+        )
+
 
 # ---------------------------------------------------------------
 # POST /api/sessions — Save analysis results
@@ -42,58 +67,69 @@ def create_session(payload: AnalysisResultIn, db: Session = Depends(get_db)):
     """
     Receives the full analysis result from the frontend and persists
     it to the database across all related tables.
-    """
 
-    # 1. Create the session
-    session = AnalysisSession(
+    Stored the same way as an upload (see persistence.save_analysis),
+    and the response is assembled from the payload, so nothing is read
+    back afterwards.
+    """
+    summary = payload.summary
+    session_id, created_at = save_analysis(
+        db,
         filename=payload.filename,
-        total_accounts=payload.summary.total_accounts_analyzed,
-        suspicious_count=payload.summary.suspicious_accounts_flagged,
-        rings_detected=payload.summary.fraud_rings_detected,
-        processing_time=payload.summary.processing_time_seconds,
-        raw_summary=json.dumps(payload.summary.model_dump()),
+        summary=summary.model_dump(),
+        accounts=[
+            (acct_in.account_id, acct_in.suspicion_score,
+             acct_in.ring_id, acct_in.detected_patterns)
+            for acct_in in payload.suspicious_accounts
+        ],
+        rings=[
+            (ring_in.ring_id, ring_in.pattern_type,
+             len(ring_in.member_accounts), ring_in.risk_score,
+             ring_in.member_accounts)
+            for ring_in in payload.fraud_rings
+        ],
     )
-    db.add(session)
-    db.flush()  # Get session.id before inserting children
-
-    # 2. Create suspicious accounts + patterns
-    for acct_in in payload.suspicious_accounts:
-        acct = SuspiciousAccount(
-            session_id=session.id,
-            account_id=acct_in.account_id,
-            suspicion_score=acct_in.suspicion_score,
-            ring_id=acct_in.ring_id,
-        )
-        db.add(acct)
-        db.flush()
-
-        for pattern_name in acct_in.detected_patterns:
-            db.add(DetectedPattern(
-                suspicious_account_id=acct.id,
-                pattern_name=pattern_name,
-            ))
-
-    # 3. Create fraud rings + members
-    for ring_in in payload.fraud_rings:
-        ring = FraudRing(
-            session_id=session.id,
-            ring_id=ring_in.ring_id,
-            pattern_type=ring_in.pattern_type,
-            risk_score=ring_in.risk_score,
-            member_count=len(ring_in.member_accounts),
-        )
-        db.add(ring)
-        db.flush()
 
-        for member_id in ring_in.member_accounts:
-            db.add(RingMember(
-                fraud_ring_id=ring.id,
-                account_id=member_id,
-            ))
-
-    db.commit()
-    db.refresh(session)
-    return session
+    # Committed — everything the response needs is already at hand, and
+    # was validated on the way in, so it is rendered as-is rather than
+    # re-validated item by item against the response model
+    accounts_out = [
+        {
+            "account_id": acct_in.account_id,
+            "suspicion_score": acct_in.suspicion_score,
+            "ring_id": acct_in.ring_id,
+            "detected_patterns": [
+                {"pattern_name": pattern_name}
+                for pattern_name in acct_in.detected_patterns
+            ],
+        }
+        for acct_in in payload.suspicious_accounts
+    ]
+    rings_out = [
+        {
+            "ring_id": ring_in.ring_id,
+            "pattern_type": ring_in.pattern_type,
+            "risk_score": ring_in.risk_score,
+            "member_count": len(ring_in.member_accounts),
+            "members": [
+                {"account_id": member_id}
+                for member_id in ring_in.member_accounts
+            ],
+        }
+        for ring_in in payload.fraud_rings
+    ]
+    return ORJSONResponse({
+        "id": session_id,
+        "filename": payload.filename,
+        "total_accounts": summary.total_accounts_analyzed,
+        "suspicious_count": summary.suspicious_accounts_flagged,
+        "rings_detected": summary.fraud_rings_detected,
+        "processing_time": summary.processing_time_seconds,
+        # Naive, as GET list / detail read the stored value back
+        "created_at": created_at.replace(tzinfo=None),
+        "suspicious_accounts": accounts_out,
+        "fraud_rings": rings_out,
+    }, status_code=status.HTTP_201_CREATED)
 
 
 # ---------------------------------------------------------------
@@ -106,11 +142,10 @@ def create_session(payload: AnalysisResultIn, db: Session = Depends(get_db)):
 )
 def list_sessions(db: Session = Depends(get_db)):
     """Returns all sessions ordered by most recent first."""
-    sessions = (
-        db.query(AnalysisSession)
-        .order_by(AnalysisSession.created_at.desc())
-        .all()
-    )
+    # Summary columns only — no loader options, so this is a single SELECT
+    sessions = db.execute(
+        select(AnalysisSession).order_by(AnalysisSession.created_at.desc())
+    ).scalars().all()
     return sessions
 
 
@@ -124,7 +159,9 @@ def list_sessions(db: Session = Depends(get_db)):
 )
 def get_session(session_id: str, db: Session = Depends(get_db)):
     """Returns full session data including nested accounts and rings."""
-    session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
+    session = db.get(
+        AnalysisSession, _parse_session_id(session_id), options=_WITH_CHILDREN,
+    )
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -143,14 +180,19 @@ def get_session(session_id: str, db: Session = Depends(get_db)):
 )
 def delete_session(session_id: str, db: Session = Depends(get_db)):
     """Deletes a session and all related data (cascading)."""
-    session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Session {session_id} not found",
+    key = _parse_session_id(session_id)
+    # A single Core DELETE: the database removes the accounts, patterns,
+    # rings and members through the foreign keys' ON DELETE CASCADE
+    with db.begin():
+        result = db.execute(
+            delete(AnalysisSession.__table__)
+            .where(AnalysisSession.__table__.c.id == key)
         )
-    db.delete(session)
-    db.commit()
+        if not result.rowcount:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Session {session_id} not found",
+            )
     return {"detail": f"Session {session_id} deleted successfully"}
 
 
@@ -159,93 +201,50 @@ def delete_session(session_id: str, db: Session = Depends(get_db)):
 # ---------------------------------------------------------------
 @router.get(
     "/{session_id}/graph",
+    response_class=ORJSONResponse,
     summary="Get graph visualization data for a session",
 )
 def get_session_graph(session_id: str, db: Session = Depends(get_db)):
     """
-    Reconstructs graph visualization data from stored DB records.
-    Returns nodes (accounts) and edges (transactions within rings),
-    plus ring metadata for the frontend GraphView component.
+    Returns graph visualization data for the session: nodes (accounts),
+    edges (transactions within rings), plus ring metadata for the
+    frontend GraphView component.
+
+    Sessions are never modified after creation, so the payload stored
+    with the session is served as-is; one is only rebuilt from the DB
+    records for sessions saved without it.
     """
-    session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
+    key = _parse_session_id(session_id)
+    session = db.get(
+        AnalysisSession, key,
+        options=[undefer(AnalysisSession.graph_payload)],
+    )
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Session {session_id} not found",
         )
 
-    # Build nodes from suspicious accounts
-    nodes = []
-    account_set: set[str] = set()
-    for acct in session.suspicious_accounts:
-        pattern_type = None
-        if acct.detected_patterns:
-            raw = acct.detected_patterns[0].pattern_name
-            # Normalize: layered_shell / shell_intermediary → shell, cycle_length_X → cycle, fan_in/fan_out → smurfing
-            if "shell" in raw or "layered" in raw:
-                pattern_type = "shell"
-            elif "cycle" in raw:
-                pattern_type = "cycle"
-            elif "fan" in raw or "smurf" in raw:
-                pattern_type = "smurfing"
-            else:
-                pattern_type = raw
-
-        nodes.append({
-            "id": acct.account_id,
-            "riskScore": acct.suspicion_score,
-            "suspicious": True,
-            "ringId": acct.ring_id,
-            "patternType": pattern_type,
-            "totalTransactions": 0,  # Not stored in DB, but not critical
-        })
-        account_set.add(acct.account_id)
-
-    # Build rings and edges from fraud ring members
-    rings = []
-    edges = []
-    edge_counter = 0
-    for ring in session.fraud_rings:
-        member_ids = [m.account_id for m in ring.members]
-        # Normalize pattern type
-        pt = ring.pattern_type
-        if "shell" in pt or "layered" in pt:
-            pt = "shell"
-
-        rings.append({
-            "ringId": ring.ring_id,
-            "patternType": pt,
-            "memberCount": ring.member_count,
-            "riskScore": ring.risk_score,
-            "members": member_ids,
-        })
-
-        # Create edges between consecutive members to show relationships
-        for i in range(len(member_ids) - 1):
-            edge_counter += 1
-            edges.append({
-                "id": f"e_{edge_counter}",
-                "source": member_ids[i],
-                "target": member_ids[i + 1],
-                "amount": 0,
-                "timestamp": session.created_at.isoformat() if session.created_at else "",
-            })
-
-            # Add non-suspicious member nodes if not already present
-            for mid in member_ids:
-                if mid not in account_set:
-                    nodes.append({
-                        "id": mid,
-                        "riskScore": 0,
-                        "suspicious": False,
-                        "ringId": ring.ring_id,
-                        "patternType": pt,
-                        "totalTransactions": 0,
-                    })
-                    account_set.add(mid)
-
-    return {
-        "nodes": nodes,
-        "edges": edges,
-        "rings": rings,
-    }
+    if session.graph_payload is not None:
+        return ORJSONResponse(session.graph_payload)
+
+    # No stored payload — load the children and reconstruct it. The
+    # session is already in the identity map, which get() would hand
+    # back as-is, so it is refreshed to apply the loader options
+    session = db.get(
+        AnalysisSession, key,
+        options=_WITH_CHILDREN, populate_existing=True,
+    )
+    return ORJSONResponse(build_graph_view(
+        (
+            (acct.account_id, acct.suspicion_score, acct.ring_id,
+             [p.pattern_name for p in acct.detected_patterns])
+            for acct in session.suspicious_accounts
+        ),
+        (
+            (ring.ring_id, ring.pattern_type, ring.member_count,
+             ring.risk_score, [m.account_id for m in ring.members])
+            for ring in session.fraud_rings
+        ),
+        session.created_at,
+    ))
@@ -5,20 +5,14 @@ POST /api/upload — accepts a CSV file, runs the detection pipeline,
 persists results to the database, and returns the formatted JSON.
 """
 
-import json
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from db.database import get_db
-from db.models import (
-    AnalysisSession,
-    SuspiciousAccount,
-    DetectedPattern,
-    FraudRing,
-    RingMember,
-)
 from backend.app.engine.analyzer import analyze
 from backend.app.engine.parser import CSVParseError
+from backend.app.persistence import save_analysis
+from backend.app.responses import ORJSONResponse
 
 router = APIRouter(prefix="/api", tags=["upload"])
 
@@ -51,13 +45,16 @@ def upload_and_analyze(
             detail="Only CSV files are accepted. Please upload a .csv file.",
         )
 
-    # Read file content
-    content = file.file.read()
-    if not content:
+    # Check the size by seeking rather than reading: the spooled upload
+    # file is handed to the pipeline as-is and parsed incrementally
+    content = file.file
+    content.seek(0, 2)
+    if not content.tell():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Uploaded file is empty.",
         )
+    content.seek(0)
 
     # Run analysis pipeline
     try:
@@ -74,57 +71,26 @@ def upload_and_analyze(
         )
 
     # ── Persist to database ───────────────────────────────────────
-    summary = result["summary"]
-
-    session_record = AnalysisSession(
+    session_id, _ = save_analysis(
+        db,
         filename=file.filename or "unknown.csv",
-        total_accounts=summary["total_accounts_analyzed"],
-        suspicious_count=summary["suspicious_accounts_flagged"],
-        rings_detected=summary["fraud_rings_detected"],
-        processing_time=summary["processing_time_seconds"],
-        raw_summary=json.dumps(summary),
+        summary=result["summary"],
+        accounts=[
+            (acct["account_id"], acct["suspicion_score"],
+             acct["ring_id"], acct["detected_patterns"])
+            for acct in result["suspicious_accounts"]
+        ],
+        rings=[
+            (ring["ring_id"], ring["pattern_type"],
+             len(ring["member_accounts"]), ring["risk_score"],
+             ring["member_accounts"])
+            for ring in result["fraud_rings"]
+        ],
     )
-    db.add(session_record)
-    db.flush()
-
-    # Save suspicious accounts
-    for acct in result["suspicious_accounts"]:
-        sa = SuspiciousAccount(
-            session_id=session_record.id,
-            account_id=acct["account_id"],
-            suspicion_score=acct["suspicion_score"],
-            ring_id=acct["ring_id"],
-        )
-        db.add(sa)
-        db.flush()
-
-        for pattern_name in acct["detected_patterns"]:
-            db.add(DetectedPattern(
-                suspicious_account_id=sa.id,
-                pattern_name=pattern_name,
-            ))
-
-    # Save fraud rings
-    for ring in result["fraud_rings"]:
-        fr = FraudRing(
-            session_id=session_record.id,
-            ring_id=ring["ring_id"],
-            pattern_type=ring["pattern_type"],
-            risk_score=ring["risk_score"],
-            member_count=len(ring["member_accounts"]),
-        )
-        db.add(fr)
-        db.flush()
-
-        for member_id in ring["member_accounts"]:
-            db.add(RingMember(
-                fraud_ring_id=fr.id,
-                account_id=member_id,
-            ))
-
-    db.commit()
 
     # Add session_id to the response
-    result["session_id"] = session_record.id
+    result["session_id"] = session_id
 
-    return result
+    # The result holds thousands of node/edge dicts; return it pre-rendered
+    # with orjson instead of going through jsonable_encoder + json.dumps
+    return ORJSONResponse(result)
@@ -0,0 +1,48 @@
+"""
+Bulk INSERT helper shared by the routes that persist analysis results.
+
+Usage:
+    from db.bulk import insert_rows
+
+    insert_rows(db, SuspiciousAccount.__table__, account_rows)
+"""
+
+from typing import Any, Dict, List
+
+from sqlalchemy import Table, insert
+from sqlalchemy.orm import Session
+
+# Bound parameters per chunk. SQLite caps a single statement at 32766
+# (999 before 3.32); server databases take far more, and bigger chunks
+# mean fewer round trips
+SQLITE_CHUNK_PARAMS = 30_000
+DEFAULT_CHUNK_PARAMS = 300_000
+
+
+def insert_rows(db: Session, table: Table, rows: List[Dict[str, Any]]) -> None:
+    """
+    INSERT rows into table as a series of executemany chunks.
+
+    Each chunk holds as many rows as fit in the dialect's parameter
+    budget, so no statement the driver builds from it (e.g. a multi-row
+    VALUES list) can exceed SQLite's variable limit, and memory for the
+    bound parameters stays flat however many rows there are.
+
+    Args:
+        db: Session whose transaction the rows are written in.
+        table: Target table.
+        rows: One dict per row, all with the same keys. Empty is a no-op.
+    """
+    if not rows:
+        return
+
+    budget = (
+        SQLITE_CHUNK_PARAMS
+        if db.get_bind().dialect.name == "sqlite"
+        else DEFAULT_CHUNK_PARAMS
+    )
+    chunk_size = max(1, budget // len(rows[0]))
+
+    stmt = insert(table)
+    for start in range(0, len(rows), chunk_size):
+        db.execute(stmt, rows[start:start + chunk_size])
@@ -14,9 +14,11 @@ Usage:
 """
 
 import os
-from sqlalchemy import create_engine
+
+import orjson
+from sqlalchemy import Uuid, create_engine, func, inspect, literal, select, text, update
 from sqlalchemy.orm import sessionmaker, Session
-from .models import Base
+from .models import Base, AnalysisSession
 
 # ------------------------------------------------------------------
 # Configuration
@@ -29,14 +31,27 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./muling_detection.db")
 
 # SQLite requires check_same_thread=False for FastAPI's async usage
 _connect_args = {}
+# Server databases get an explicitly sized pool: FastAPI runs sync
+# handlers on a threadpool, so concurrent requests each hold a connection
+# and the default QueuePool (5 + 10 overflow) runs dry under load.
+# Connections are recycled hourly, before server-side idle timeouts drop them
+_pool_args = {"pool_size": 20, "max_overflow": 40, "pool_recycle": 3600}
 if DATABASE_URL.startswith("sqlite"):
     _connect_args = {"check_same_thread": False, "timeout": 30}
+    _pool_args = {}
 
 engine = create_engine(
     DATABASE_URL,
     connect_args=_connect_args,
     pool_pre_ping=True,
     echo=False,  # Set True to log all SQL statements (debugging)
+    # JSON columns are encoded / decoded with orjson rather than stdlib json
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
+    # Bulk INSERTs are sent as multi-row VALUES batches of this many rows
+    # (where the driver supports it), bounding statement size and memory
+    insertmanyvalues_page_size=1000,
+    **_pool_args,
 )
 
 # Enable WAL mode for SQLite to allow concurrent reads during writes
@@ -48,6 +63,15 @@ if DATABASE_URL.startswith("sqlite"):
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA journal_mode=WAL")
         cursor.execute("PRAGMA busy_timeout=30000")
+        # SQLite leaves foreign keys (and so their ON DELETE CASCADE)
+        # unenforced unless turned on per connection
+        cursor.execute("PRAGMA foreign_keys=ON")
+        # With WAL, NORMAL only syncs at checkpoints rather than on every
+        # commit; still safe against corruption, a power loss can at most
+        # drop the last few commits
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+        cursor.execute("PRAGMA temp_store=MEMORY")
         cursor.close()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -56,8 +80,69 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 def init_db() -> None:
     """Create all tables defined in models.py.
     Safe to call multiple times — existing tables are not recreated.
+    Nullable columns and indexes missing from tables created before they
+    were declared are added to those tables, and ids stored in the old
+    string form are converted.
     """
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    if engine.dialect.name == "sqlite":
+        _convert_string_ids()
+
+
+def _add_missing_columns() -> None:
+    """ALTER TABLE ... ADD COLUMN for each nullable model column (e.g.
+    analysis_sessions.graph_payload) that an existing table lacks.
+    Columns that are NOT NULL would need a value for the existing rows,
+    so those are left to a proper migration.
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} "
+                    f"{column.type.compile(dialect=engine.dialect)}"
+                ))
+
+
+def _convert_string_ids() -> None:
+    """Rewrite ids stored before the keys became Uuid columns.
+
+    Those rows hold the dashed 36-character string, while on SQLite the
+    Uuid type stores and matches the dashless 32-character hex, so the
+    old rows could no longer be looked up. Every key and foreign key is
+    rewritten in one transaction, with the foreign key checks deferred
+    to its commit. Old rows are only ever children of old sessions, so
+    finding none in analysis_sessions means there is nothing to do.
+    """
+    sessions = AnalysisSession.__table__
+    with engine.begin() as conn:
+        legacy = conn.execute(
+            select(literal(1))
+            .where(func.length(sessions.c.id) == 36)
+            .limit(1)
+        ).first()
+        if legacy is None:
+            return
+
+        conn.exec_driver_sql("PRAGMA defer_foreign_keys=ON")
+        for table in Base.metadata.sorted_tables:
+            for column in table.columns:
+                if isinstance(column.type, Uuid):
+                    conn.execute(
+                        update(table)
+                        .where(func.length(column) == 36)
+                        .values({column.name: func.replace(column, "-", "")})
+                    )
 
 
 def get_db():
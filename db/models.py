@@ -17,15 +17,13 @@ from sqlalchemy import (
     String,
     Float,
     Integer,
-    Text,
+    JSON,
     DateTime,
     ForeignKey,
+    Uuid,
 )
-from sqlalchemy.orm import relationship, DeclarativeBase
-
-
-def _generate_uuid() -> str:
-    return str(uuid.uuid4())
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, deferred, DeclarativeBase
 
 
 class Base(DeclarativeBase):
@@ -39,31 +37,50 @@ class Base(DeclarativeBase):
 class AnalysisSession(Base):
     __tablename__ = "analysis_sessions"
 
-    id = Column(String, primary_key=True, default=_generate_uuid)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     filename = Column(String, nullable=False, doc="Original CSV filename")
     total_accounts = Column(Integer, nullable=False, doc="Total unique accounts analyzed")
     suspicious_count = Column(Integer, nullable=False, doc="Number of flagged accounts")
     rings_detected = Column(Integer, nullable=False, doc="Number of fraud rings found")
     processing_time = Column(Float, nullable=False, doc="Processing duration in seconds")
-    raw_summary = Column(Text, nullable=False, doc="Full analysis summary as JSON string")
+    raw_summary = Column(
+        JSON().with_variant(JSONB, "postgresql"),  # indexable on Postgres
+        nullable=False,
+        doc="Full analysis summary",
+    )
+    # Deferred: only the graph view reads it (opting in with undefer), so
+    # list and detail queries never pull the whole payload per session
+    graph_payload = deferred(
+        Column(
+            JSON().with_variant(JSONB, "postgresql"),
+            nullable=True,
+            doc="Graph view nodes / edges / rings, materialized at creation",
+        ),
+        raiseload=True,
+    )
     created_at = Column(
         DateTime,
         default=lambda: datetime.now(timezone.utc),
+        index=True,  # list view orders by it
         doc="Timestamp of analysis run",
     )
 
-    # Relationships
+    # Relationships — lazy="raise" throughout: a query that needs related
+    # rows must ask for them with loader options (e.g. selectinload), so
+    # nothing is ever fetched implicitly, one row at a time
     suspicious_accounts = relationship(
         "SuspiciousAccount",
         back_populates="session",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # the database cascades deletes
+        lazy="raise",
     )
     fraud_rings = relationship(
         "FraudRing",
         back_populates="session",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # the database cascades deletes
+        lazy="raise",
     )
 
     def __repr__(self) -> str:
@@ -76,23 +93,29 @@ class AnalysisSession(Base):
 class SuspiciousAccount(Base):
     __tablename__ = "suspicious_accounts"
 
-    id = Column(String, primary_key=True, default=_generate_uuid)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     session_id = Column(
-        String,
+        Uuid,
         ForeignKey("analysis_sessions.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     account_id = Column(String, nullable=False, doc="e.g. ACC_00123")
     suspicion_score = Column(Float, nullable=False, doc="Score 0-100")
     ring_id = Column(String, nullable=False, doc="e.g. RING_001")
 
     # Relationships
-    session = relationship("AnalysisSession", back_populates="suspicious_accounts")
+    session = relationship(
+        "AnalysisSession",
+        back_populates="suspicious_accounts",
+        lazy="raise",
+    )
     detected_patterns = relationship(
         "DetectedPattern",
         back_populates="suspicious_account",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # the database cascades deletes
+        lazy="raise",
     )
 
     def __repr__(self) -> str:
@@ -105,11 +128,12 @@ class SuspiciousAccount(Base):
 class DetectedPattern(Base):
     __tablename__ = "detected_patterns"
 
-    id = Column(String, primary_key=True, default=_generate_uuid)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     suspicious_account_id = Column(
-        String,
+        Uuid,
         ForeignKey("suspicious_accounts.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     pattern_name = Column(
         String,
@@ -118,7 +142,11 @@ class DetectedPattern(Base):
     )
 
     # Relationships
-    suspicious_account = relationship("SuspiciousAccount", back_populates="detected_patterns")
+    suspicious_account = relationship(
+        "SuspiciousAccount",
+        back_populates="detected_patterns",
+        lazy="raise",
+    )
 
     def __repr__(self) -> str:
         return f"<DetectedPattern {self.pattern_name}>"
@@ -130,11 +158,12 @@ class DetectedPattern(Base):
 class FraudRing(Base):
     __tablename__ = "fraud_rings"
 
-    id = Column(String, primary_key=True, default=_generate_uuid)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     session_id = Column(
-        String,
+        Uuid,
         ForeignKey("analysis_sessions.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     ring_id = Column(String, nullable=False, doc="e.g. RING_001")
     pattern_type = Column(
@@ -146,12 +175,17 @@ class FraudRing(Base):
     member_count = Column(Integer, nullable=False, doc="Number of member accounts")
 
     # Relationships
-    session = relationship("AnalysisSession", back_populates="fraud_rings")
+    session = relationship(
+        "AnalysisSession",
+        back_populates="fraud_rings",
+        lazy="raise",
+    )
     members = relationship(
         "RingMember",
         back_populates="ring",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # the database cascades deletes
+        lazy="raise",
     )
 
     def __repr__(self) -> str:
@@ -164,16 +198,21 @@ class FraudRing(Base):
 class RingMember(Base):
     __tablename__ = "ring_members"
 
-    id = Column(String, primary_key=True, default=_generate_uuid)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     fraud_ring_id = Column(
-        String,
+        Uuid,
         ForeignKey("fraud_rings.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     account_id = Column(String, nullable=False, doc="Member account ID")
 
     # Relationships
-    ring = relationship("FraudRing", back_populates="members")
+    ring = relationship(
+        "FraudRing",
+        back_populates="members",
+        lazy="raise",
+    )
 
     def __repr__(self) -> str:
         return f"<RingMember {self.account_id}>"
@@ -7,6 +7,7 @@ structure of API payloads.
 """
 
 from __future__ import annotations
+import uuid
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -52,7 +53,7 @@ class FraudRingOut(BaseModel):
 
 class SessionSummaryOut(BaseModel):
     """Lightweight session metadata for list views."""
-    id: str
+    id: uuid.UUID
     filename: str
     total_accounts: int
     suspicious_count: int